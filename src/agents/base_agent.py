@@ -1,16 +1,33 @@
+import asyncio
+from functools import cached_property
+import httpx
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from src.config import config
 from src.workflows.state import DocumentState
 
+# Falhas transitórias do LLM/rede: os agentes as propagam para que o workflow repita o nó
+TRANSIENT_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError, httpx.TransportError)
+
 class BaseAgent:
-    def __init__(self):
-        self.llm = ChatOpenAI(
+    @cached_property
+    def llm(self) -> ChatOpenAI:
+        """Cliente do LLM, criado no primeiro uso (agentes baseados em regras nunca o instanciam)"""
+        return ChatOpenAI(
             api_key=config.OPENAI_API_KEY,
             model="gpt-4",
             temperature=0.1
         )
     
+    def process(self, state: DocumentState) -> DocumentState:
+        """Processa o estado; agentes que implementam apenas execute são atendidos por ele"""
+        return self.execute(state)
+    
+    async def aprocess(self, state: DocumentState) -> DocumentState:
+        """Versão assíncrona de process: executa o processamento bloqueante em uma thread"""
+        return await asyncio.to_thread(self.process, state)
+    
     def log_action(self, state: DocumentState, message: str):
         if "processing_log" not in state:
             state["processing_log"] = []
@@ -40,6 +57,8 @@ class DocumentGeneratorAgent(BaseAgent):
             state["is_complete"] = True
             self.log_action(state, "Documento gerado com sucesso")
             
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             self.log_action(state, f"Erro: {str(e)}")
             state["is_complete"] = False
@@ -9,7 +9,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel
 
-from src.agents.base_agent import BaseAgent
+from src.agents.base_agent import BaseAgent, TRANSIENT_ERRORS
 from src.workflows.state import DocumentState, ProcessingStatus, DocumentType
 
 logger = structlog.get_logger()
@@ -64,6 +64,8 @@ class ClassifierAgent(BaseAgent):
                                  f"(complexidade: {classification.complexity}, "
                                  f"confiança: {classification.confidence:.2f})")
             
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             self.log_action(state, f"Erro na classificação: {str(e)}")
             state["error_messages"].append(f"Classification Error: {str(e)}")
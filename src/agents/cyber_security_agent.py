@@ -67,7 +67,7 @@ class CyberSecurityAgent(BaseAgent):
             )
             
             # Atualizar estado
-            state["cyber_security"] = {
+            state["cyber_security_results"] = {
                 "iso_assessment": iso_assessment,
                 "vulnerabilities": vulnerabilities,
                 "security_risks": security_risks,
@@ -84,7 +84,7 @@ class CyberSecurityAgent(BaseAgent):
         except Exception as e:
             logger.error("Erro na avaliação de segurança", 
                         error=str(e), document_id=state.get("document_id"))
-            state["cyber_security"] = {
+            state["cyber_security_results"] = {
                 "status": "error",
                 "error": str(e),
                 "assessment_timestamp": datetime.now().isoformat()
@@ -60,7 +60,7 @@ class DataMappingAgent(BaseAgent):
             )
             
             # Atualizar estado
-            state["data_mapping"] = {
+            state["data_mapping_results"] = {
                 "data_flow": data_flow,
                 "collection_points": collection_points,
                 "retention_analysis": retention_analysis,
@@ -77,7 +77,7 @@ class DataMappingAgent(BaseAgent):
         except Exception as e:
             logger.error("Erro no mapeamento de dados", 
                         error=str(e), document_id=state.get("document_id"))
-            state["data_mapping"] = {
+            state["data_mapping_results"] = {
                 "status": "error",
                 "error": str(e),
                 "mapping_timestamp": datetime.now().isoformat()
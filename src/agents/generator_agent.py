@@ -9,7 +9,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 import re
 
-from src.agents.base_agent import BaseAgent
+from src.agents.base_agent import BaseAgent, TRANSIENT_ERRORS
 from src.workflows.state import DocumentState, ProcessingStatus
 
 logger = structlog.get_logger()
@@ -54,6 +54,8 @@ class GeneratorAgent(BaseAgent):
             self.log_action(state, f"Conteúdo gerado: {len(full_content)} caracteres, "
                                  f"{len(content_sections)} seções, {len(legal_clauses)} cláusulas")
             
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             self.log_action(state, f"Erro na geração: {str(e)}")
             state["error_messages"].append(f"Generation Error: {str(e)}")
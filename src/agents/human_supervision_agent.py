@@ -54,6 +54,7 @@ class HumanSupervisionAgent(BaseAgent):
                 state["current_status"] = ProcessingStatus.APPROVED
                 state["is_approved"] = True
                 state["can_be_delivered"] = True
+                state["is_complete"] = True
                 self.log_action(state, f"Documento aprovado por {feedback.reviewer_name}")
             elif feedback.approval_status == "needs_revision":
                 state["current_status"] = ProcessingStatus.HUMAN_REVIEW
@@ -62,6 +63,7 @@ class HumanSupervisionAgent(BaseAgent):
             else:  # rejected
                 state["current_status"] = ProcessingStatus.REJECTED
                 state["is_approved"] = False
+                state["is_complete"] = True
                 self.log_action(state, f"Documento rejeitado por {feedback.reviewer_name}")
             
         except Exception as e:
@@ -323,11 +325,13 @@ class HumanSupervisionAgent(BaseAgent):
             state["current_status"] = ProcessingStatus.APPROVED
             state["is_approved"] = True
             state["can_be_delivered"] = True
+            state["is_complete"] = True
         elif decision == "needs_revision":
             state["current_status"] = ProcessingStatus.HUMAN_REVIEW
             state["revision_attempts"] = state.get("revision_attempts", 0) + 1
         else:  # rejected
             state["current_status"] = ProcessingStatus.REJECTED
             state["is_approved"] = False
+            state["is_complete"] = True
         
         return state
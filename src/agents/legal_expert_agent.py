@@ -79,7 +79,7 @@ class LegalExpertAgent(BaseAgent):
             )
             
             # Atualizar estado
-            state["legal_expert"] = {
+            state["legal_expert_results"] = {
                 "legal_analysis": legal_analysis,
                 "jurisprudence_analysis": jurisprudence_analysis,
                 "regulatory_compliance": regulatory_compliance,
@@ -97,7 +97,7 @@ class LegalExpertAgent(BaseAgent):
         except Exception as e:
             logger.error("Erro na assessoria jurídica", 
                         error=str(e), document_id=state.get("document_id"))
-            state["legal_expert"] = {
+            state["legal_expert_results"] = {
                 "status": "error",
                 "error": str(e),
                 "analysis_timestamp": datetime.now().isoformat()
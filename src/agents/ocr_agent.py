@@ -39,6 +39,7 @@ except ImportError:
 from src.agents.base_agent import BaseAgent
 from src.workflows.state import DocumentState, ProcessingStatus
 from src.config import config
+from src.storage import storage
 
 logger = structlog.get_logger()
 
@@ -92,19 +93,21 @@ class OCRAgent(BaseAgent):
             state["current_status"] = ProcessingStatus.PROCESSING
             state["current_step"] = "OCR Processing"
             
-            if not state.get("uploaded_file"):
+            file_ref = state.get("uploaded_file_ref")
+            file_bytes = storage.get(file_ref) if file_ref else state.get("uploaded_file")
+            if not file_bytes:
                 self.log_action(state, "Nenhum arquivo para processar")
                 return state
             
             # Determinar tipo de arquivo
-            file_type = self._detect_file_type(state["uploaded_file"])
+            file_type = self._detect_file_type(file_bytes)
             state["file_type"] = file_type
             
             # Processar baseado no tipo
             if file_type == "pdf":
-                extracted_text, confidence = self._process_pdf(state["uploaded_file"])
+                extracted_text, confidence = self._process_pdf(file_bytes)
             elif file_type in ["image"]:
-                extracted_text, confidence = self._process_image(state["uploaded_file"])
+                extracted_text, confidence = self._process_image(file_bytes)
             else:
                 # Para testes, simular extração de texto
                 extracted_text = "Texto extraído do documento de teste"
@@ -126,6 +129,12 @@ class OCRAgent(BaseAgent):
             state["document_classification"] = document_classification
             state["current_status"] = ProcessingStatus.OCR_COMPLETE
             
+            # Arquivo processado: não é mais necessário
+            state["uploaded_file"] = None
+            if file_ref:
+                storage.delete(file_ref)
+                state["uploaded_file_ref"] = None
+            
             self.log_action(state, f"OCR concluído: {len(processed_text)} caracteres, confiança: {confidence:.2f}")
             
         except Exception as e:
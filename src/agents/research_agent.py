@@ -9,7 +9,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel
 
-from src.agents.base_agent import BaseAgent
+from src.agents.base_agent import BaseAgent, TRANSIENT_ERRORS
 from src.workflows.state import DocumentState, ProcessingStatus
 
 logger = structlog.get_logger()
@@ -156,6 +156,8 @@ class ResearchAgent(BaseAgent):
             self.log_action(state, f"Pesquisa regulatória concluída: {len(research.applicable_laws)} leis aplicáveis, "
                                  f"risco: {research.risk_level}")
             
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             self.log_action(state, f"Erro na pesquisa regulatória: {str(e)}")
             state["error_messages"].append(f"Research Error: {str(e)}")
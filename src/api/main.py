@@ -2,40 +2,129 @@
 API FastAPI principal para o sistema Privacy Point
 """
 from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks, Depends, Body, Request
+from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set, TYPE_CHECKING
+from contextlib import asynccontextmanager
+import logging
 import structlog
 from datetime import datetime
 import uuid
+import time
 import asyncio
+import orjson
+import httpx
+from cachetools import TTLCache
 
-from src.workflows.workflow import DocumentWorkflow
-from src.workflows.state import DocumentState, WorkflowContext
+from src.workflows.state import DocumentState, WorkflowContext, snapshot_state, state_delta
 from src.config import config
 
-# Configurar logging
+if TYPE_CHECKING:
+    from src.workflows.workflow import DocumentWorkflow
+
+# Configurar logging (níveis desabilitados são descartados antes de montar o evento)
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(
+        getattr(logging, config.LOG_LEVEL.upper(), logging.INFO)
+    ),
+    cache_logger_on_first_use=True
+)
 logger = structlog.get_logger()
 
+# Middleware ASGI para logging (evita a task extra por requisição do BaseHTTPMiddleware)
+class AccessLogMiddleware:
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter()
+        status_code = 500
+        
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            logger.info(
+                "Requisição HTTP",
+                method=scope["method"],
+                path=scope["path"],
+                status_code=status_code,
+                duration=time.perf_counter() - start_time
+            )
+
+# Cliente HTTP compartilhado para webhooks (com novas tentativas de conexão)
+_webhook_client = httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(retries=3))
+
+# Referências às tasks em segundo plano, evitando que sejam coletadas antes de terminar
+_background_tasks: Set[asyncio.Task] = set()
+
+# Tempo máximo, em segundos, para os webhooks em andamento terminarem no encerramento da aplicação
+WEBHOOK_SHUTDOWN_TIMEOUT = 10.0
+
+# Workflow criado na inicialização da aplicação (importar os agentes é caro)
+workflow: Optional["DocumentWorkflow"] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global workflow
+    from src.workflows.workflow import DocumentWorkflow, aopen_checkpointer, aclose_checkpointer
+    
+    workflow = DocumentWorkflow()
+    # Conectar o checkpointer antes das requisições: a primeira conexão não pode ser disputada
+    await aopen_checkpointer()
+    yield
+    # Aguardar os webhooks em andamento antes de fechar o cliente HTTP que eles usam
+    if _background_tasks:
+        _, pending = await asyncio.wait(list(_background_tasks), timeout=WEBHOOK_SHUTDOWN_TIMEOUT)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning("Webhooks interrompidos no encerramento", pending=len(pending))
+    await _webhook_client.aclose()
+    await aclose_checkpointer()
+
 # Criar aplicação FastAPI
 app = FastAPI(
     title="Privacy Point API",
     description="API para automação inteligente de documentos regulatórios LGPD/ANPD",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+    middleware=[
+        Middleware(
+            CORSMiddleware,
+            allow_origins=["*"],  # Em produção, especificar origens permitidas
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        ),
+        Middleware(AccessLogMiddleware)
+    ]
 )
 
-# Configurar CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Em produção, especificar origens permitidas
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Cache de curta duração para estados do workflow (evita consultar o checkpointer a cada polling)
+_state_cache = TTLCache(maxsize=4096, ttl=2.0)
 
-# Inicializar workflow
-workflow = DocumentWorkflow()
+async def _get_state(document_id: str):
+    """Obtém o estado de um documento, usando o cache quando disponível"""
+    thread = _state_cache.get(document_id)
+    if thread is not None:
+        return thread
+    
+    thread = await workflow.graph.aget_state({"configurable": {"thread_id": document_id}})
+    _state_cache[document_id] = thread
+    return thread
 
 # Modelos Pydantic para requests/responses
 class DocumentRequest(BaseModel):
@@ -63,6 +152,7 @@ class DocumentStatus(BaseModel):
     current_status: str
     current_step: str
     is_complete: bool
+    is_failed: bool
     is_approved: bool
     processing_time: float
     quality_score: float
@@ -87,20 +177,30 @@ class ReviewDecision(BaseModel):
     feedback: str
     confidence_level: Optional[float] = 0.8
 
-# Middleware para logging
-@app.middleware("http")
-async def log_requests(request, call_next):
-    start_time = datetime.now()
-    response = await call_next(request)
-    end_time = datetime.now()
+# Métricas do sistema (pré-montadas até existir coleta real)
+_METRICS = {
+    "total_documents_processed": 0,
+    "average_processing_time": 0.0,
+    "success_rate": 0.0,
+    "active_workflows": 0
+}
+
+# Dependências
+async def get_document_state(document_id: str) -> DocumentState:
+    """Recupera o estado atual de um documento ou responde 404"""
+    try:
+        thread = await _get_state(document_id)
+    except Exception as e:
+        logger.error("Erro ao recuperar estado", error=str(e), document_id=document_id)
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
     
-    logger.info(
-        f"{request.method} {request.url.path}",
-        status_code=response.status_code,
-        duration=(end_time - start_time).total_seconds()
-    )
+    if not thread or not thread.values:
+        raise HTTPException(status_code=404, detail="Documento não encontrado")
     
-    return response
+    return thread.values
+
+# Resposta do health check, renovada no máximo uma vez por segundo: [instante monotônico, corpo JSON]
+_HEALTH_CACHE = [float("-inf"), b""]
 
 # Endpoints principais
 @app.post("/api/v1/documents/generate", response_model=DocumentResponse)
@@ -140,34 +240,8 @@ async def generate_document(
                     detail=f"Arquivo muito grande. Tamanho máximo: {config.MAX_FILE_SIZE} bytes"
                 )
         
-        # Criar contexto do workflow
-        context = WorkflowContext(
-            workflow_id=str(uuid.uuid4()),
-            user_id=None,  # Implementar autenticação
-            session_id=str(uuid.uuid4()),
-            priority="medium",
-            deadline=None,
-            custom_requirements=document_request.custom_requirements,
-            template_preferences={},
-            quality_threshold=0.8,
-            compliance_level="standard"
-        )
-        
-        # Criar estado inicial
-        initial_state = workflow.create_initial_state(
-            document_type=document_request.document_type,
-            company_name=document_request.company_name,
-            activity_description=document_request.activity_description,
-            uploaded_file=file_content,
-            context=context
-        )
-        
-        # Adicionar informações adicionais
-        initial_state["language"] = document_request.language
-        initial_state["jurisdiction"] = document_request.jurisdiction
-        initial_state["industry_sector"] = document_request.industry_sector
-        initial_state["webhook_url"] = document_request.webhook_url
-        initial_state["external_system_id"] = document_request.external_system_id
+        # Preparar estado inicial
+        initial_state = prepare_initial_state(document_request, file_content)
         
         # Executar workflow em background
         background_tasks.add_task(execute_workflow_async, initial_state)
@@ -175,7 +249,7 @@ async def generate_document(
         # Estimar tempo de conclusão
         estimated_time = estimate_completion_time(document_request.document_type, document_request.industry_sector)
         
-        logger.info(f"Documento {initial_state['document_id']} iniciado")
+        logger.info("Documento iniciado", document_id=initial_state["document_id"])
         
         return DocumentResponse(
             document_id=initial_state["document_id"],
@@ -187,7 +261,7 @@ async def generate_document(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erro ao gerar documento: {e}")
+        logger.error("Erro ao gerar documento", error=str(e))
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 @app.get("/api/v1/documents/{document_id}/status", response_model=DocumentStatus)
@@ -196,7 +270,7 @@ async def get_document_status(document_id: str):
     Obtém o status atual de um documento
     """
     try:
-        status = workflow.get_workflow_status(document_id)
+        status = await workflow.astatus_from_snapshot(document_id, await _get_state(document_id))
         
         if status.get("status") == "not_found":
             raise HTTPException(status_code=404, detail="Documento não encontrado")
@@ -208,35 +282,31 @@ async def get_document_status(document_id: str):
             current_status=status.get("current_status", "unknown"),
             current_step=status.get("current_step", "unknown"),
             is_complete=status.get("is_complete", False),
+            is_failed=status.get("is_failed", False),
             is_approved=status.get("is_approved", False),
             processing_time=status.get("processing_time", 0.0),
             quality_score=status.get("quality_score", 0.0),
             compliance_score=status.get("compliance_score", 0.0),
             error_messages=status.get("error_messages", []),
-            created_at=datetime.now(),  # Implementar recuperação real
-            updated_at=datetime.now()
+            created_at=status.get("created_at"),
+            updated_at=status.get("updated_at")
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erro ao obter status: {e}")
+        logger.error("Erro ao obter status", error=str(e), document_id=document_id)
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 @app.get("/api/v1/documents/{document_id}/content", response_model=DocumentContent)
-async def get_document_content(document_id: str):
+async def get_document_content(
+    document_id: str,
+    state: DocumentState = Depends(get_document_state)
+):
     """
     Obtém o conteúdo de um documento aprovado
     """
     try:
-        # Recuperar estado do documento
-        thread = workflow.app.get_state({"configurable": {"thread_id": document_id}})
-        
-        if not thread or not thread.values:
-            raise HTTPException(status_code=404, detail="Documento não encontrado")
-        
-        state = thread.values[-1]
-        
         if not state.get("is_approved", False):
             raise HTTPException(status_code=400, detail="Documento ainda não foi aprovado")
         
@@ -261,26 +331,19 @@ async def get_document_content(document_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erro ao obter conteúdo: {e}")
+        logger.error("Erro ao obter conteúdo", error=str(e), document_id=document_id)
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 @app.post("/api/v1/documents/{document_id}/review")
 async def submit_review_decision(
     document_id: str,
-    decision: ReviewDecision
+    decision: ReviewDecision,
+    current_state: DocumentState = Depends(get_document_state)
 ):
     """
     Submete decisão de revisão humana
     """
     try:
-        # Recuperar estado atual
-        thread = workflow.app.get_state({"configurable": {"thread_id": document_id}})
-        
-        if not thread or not thread.values:
-            raise HTTPException(status_code=404, detail="Documento não encontrado")
-        
-        current_state = thread.values[-1]
-        
         # Processar decisão
         reviewer_info = {
             "reviewer_id": decision.reviewer_id,
@@ -289,17 +352,18 @@ async def submit_review_decision(
             "review_time_minutes": 5  # Implementar cálculo real
         }
         
-        updated_state = workflow.human_supervision_agent.process_review_decision(
-            current_state, decision.decision, reviewer_info, decision.feedback
+        updated_state = workflow.get_agent("human_supervision").process_review_decision(
+            snapshot_state(current_state), decision.decision, reviewer_info, decision.feedback
         )
         
         # Atualizar estado no workflow
-        workflow.app.update_state(
+        await workflow.graph.aupdate_state(
             {"configurable": {"thread_id": document_id}},
-            updated_state
+            state_delta(current_state, updated_state)
         )
+        _state_cache.pop(document_id, None)
         
-        logger.info(f"Decisão de revisão submetida para {document_id}: {decision.decision}")
+        logger.info("Decisão de revisão submetida", document_id=document_id, decision=decision.decision)
         
         return {
             "document_id": document_id,
@@ -311,7 +375,7 @@ async def submit_review_decision(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Erro ao processar decisão de revisão: {e}")
+        logger.error("Erro ao processar decisão de revisão", error=str(e), document_id=document_id)
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 @app.delete("/api/v1/documents/{document_id}")
@@ -322,7 +386,7 @@ async def delete_document(document_id: str):
     try:
         # Em uma implementação real, isso removeria o documento do storage
         # Por enquanto, apenas retornamos sucesso
-        logger.info(f"Documento {document_id} removido")
+        logger.info("Documento removido", document_id=document_id)
         
         return {
             "document_id": document_id,
@@ -331,7 +395,7 @@ async def delete_document(document_id: str):
         }
         
     except Exception as e:
-        logger.error(f"Erro ao remover documento: {e}")
+        logger.error("Erro ao remover documento", error=str(e), document_id=document_id)
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
 @app.get("/api/v1/health")
@@ -339,11 +403,16 @@ async def health_check():
     """
     Verifica saúde da API
     """
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
-    }
+    now = time.monotonic()
+    if now - _HEALTH_CACHE[0] > 1.0:
+        _HEALTH_CACHE[0] = now
+        _HEALTH_CACHE[1] = orjson.dumps({
+            "status": "healthy",
+            "timestamp": datetime.now().isoformat(),
+            "version": "1.0.0"
+        })
+    
+    return Response(content=_HEALTH_CACHE[1], media_type="application/json")
 
 @app.get("/api/v1/metrics")
 async def get_metrics():
@@ -351,33 +420,57 @@ async def get_metrics():
     Obtém métricas do sistema
     """
     # Implementar métricas reais
-    return {
-        "total_documents_processed": 0,
-        "average_processing_time": 0.0,
-        "success_rate": 0.0,
-        "active_workflows": 0
-    }
+    return ORJSONResponse(_METRICS)
 
 # Funções auxiliares
+def prepare_initial_state(document_request: DocumentRequest, file_content: Optional[bytes]) -> DocumentState:
+    """Monta o contexto e o estado inicial do workflow a partir da requisição"""
+    context = WorkflowContext(
+        workflow_id=str(uuid.uuid4()),
+        user_id=None,  # Implementar autenticação
+        session_id=str(uuid.uuid4()),
+        priority="medium",
+        deadline=None,
+        custom_requirements=document_request.custom_requirements,
+        template_preferences={},
+        quality_threshold=0.8,
+        compliance_level="standard"
+    )
+    
+    initial_state = workflow.create_initial_state(
+        document_type=document_request.document_type,
+        company_name=document_request.company_name,
+        activity_description=document_request.activity_description,
+        uploaded_file=file_content,
+        context=context,
+        industry_sector=document_request.industry_sector,
+        language=document_request.language,
+        jurisdiction=document_request.jurisdiction,
+        webhook_url=document_request.webhook_url,
+        external_system_id=document_request.external_system_id
+    )
+    
+    return initial_state
+
 async def execute_workflow_async(initial_state: DocumentState):
     """Executa workflow de forma assíncrona"""
     try:
-        final_state = workflow.execute_workflow(initial_state)
+        final_state = await workflow.arun(initial_state)
         
-        # Enviar webhook se configurado
+        # Enviar webhook se configurado (sem bloquear o término da task)
         if final_state.get("webhook_url"):
-            await send_webhook_notification(final_state)
+            task = asyncio.create_task(send_webhook_notification(final_state))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
             
-        logger.info(f"Workflow concluído para {initial_state['document_id']}")
+        logger.info("Workflow concluído", document_id=initial_state["document_id"])
         
     except Exception as e:
-        logger.error(f"Erro no workflow assíncrono: {e}")
+        logger.error("Erro no workflow assíncrono", error=str(e), document_id=initial_state.get("document_id"))
 
 async def send_webhook_notification(state: DocumentState):
     """Envia notificação webhook"""
     try:
-        import httpx
-        
         payload = {
             "document_id": state["document_id"],
             "status": state["current_status"],
@@ -388,13 +481,12 @@ async def send_webhook_notification(state: DocumentState):
             "compliance_score": state["compliance_score"]
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(state["webhook_url"], json=payload)
-            
-        logger.info(f"Webhook enviado para {state['webhook_url']}")
+        await _webhook_client.post(state["webhook_url"], json=payload)
+        
+        logger.info("Webhook enviado", webhook_url=state["webhook_url"], document_id=state["document_id"])
         
     except Exception as e:
-        logger.error(f"Erro ao enviar webhook: {e}")
+        logger.error("Erro ao enviar webhook", error=str(e), document_id=state.get("document_id"))
 
 def estimate_completion_time(document_type: str, industry_sector: str) -> int:
     """Estima tempo de conclusão em minutos"""
@@ -1,81 +1,117 @@
 import os
+from dataclasses import dataclass
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Optional, FrozenSet
 
 load_dotenv()
 
+@dataclass(frozen=True, slots=True)
 class Config:
     # OpenAI
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    
+    OPENAI_API_KEY: Optional[str]
+
     # Debug
-    DEBUG = os.getenv("DEBUG", "True").lower() == "true"
-    
+    DEBUG: bool
+
     # Serviços de OCR
-    TESSERACT_PATH = os.getenv("TESSERACT_PATH", "/usr/bin/tesseract")
-    PADDLE_OCR_ENABLED = os.getenv("PADDLE_OCR_ENABLED", "False").lower() == "true"
-    
+    TESSERACT_PATH: str
+    PADDLE_OCR_ENABLED: bool
+
     # AWS Services
-    AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
-    AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
-    AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
-    AWS_TEXTRACT_ENABLED = os.getenv("AWS_TEXTRACT_ENABLED", "False").lower() == "true"
-    
+    AWS_ACCESS_KEY_ID: Optional[str]
+    AWS_SECRET_ACCESS_KEY: Optional[str]
+    AWS_REGION: str
+    AWS_TEXTRACT_ENABLED: bool
+
     # Azure Services
-    AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT")
-    AZURE_DOCUMENT_INTELLIGENCE_KEY = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_KEY")
-    AZURE_ENABLED = os.getenv("AZURE_ENABLED", "False").lower() == "true"
-    
+    AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT: Optional[str]
+    AZURE_DOCUMENT_INTELLIGENCE_KEY: Optional[str]
+    AZURE_ENABLED: bool
+
     # Google Cloud
-    GOOGLE_CLOUD_PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT_ID")
-    GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    GOOGLE_DOCUMENT_AI_ENABLED = os.getenv("GOOGLE_DOCUMENT_AI_ENABLED", "False").lower() == "true"
-    
+    GOOGLE_CLOUD_PROJECT_ID: Optional[str]
+    GOOGLE_APPLICATION_CREDENTIALS: Optional[str]
+    GOOGLE_DOCUMENT_AI_ENABLED: bool
+
     # Database
-    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./privacy_point.db")
-    MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017/privacy_point")
-    
+    DATABASE_URL: str
+    MONGODB_URL: str
+    CHECKPOINT_DB: str
+
     # Redis
-    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
-    
+    REDIS_URL: str
+
     # API Configuration
-    API_HOST = os.getenv("API_HOST", "0.0.0.0")
-    API_PORT = int(os.getenv("API_PORT", "8000"))
-    API_WORKERS = int(os.getenv("API_WORKERS", "1"))
-    
+    API_HOST: str
+    API_PORT: int
+    API_WORKERS: int
+
     # Security
-    SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
-    ALGORITHM = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
-    
+    SECRET_KEY: str
+    ALGORITHM: str
+    ACCESS_TOKEN_EXPIRE_MINUTES: int
+
     # File Storage
-    MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", "10485760"))  # 10MB
-    ALLOWED_EXTENSIONS = {".pdf", ".png", ".jpg", ".jpeg", ".tiff", ".bmp"}
-    
+    MAX_FILE_SIZE: int
+    ALLOWED_EXTENSIONS: FrozenSet[str]
+    UPLOAD_DIR: str
+
     # Monitoring
-    SENTRY_DSN = os.getenv("SENTRY_DSN")
-    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-    
+    SENTRY_DSN: Optional[str]
+    LOG_LEVEL: str
+
     # Quality Control
-    MIN_QUALITY_SCORE = float(os.getenv("MIN_QUALITY_SCORE", "0.8"))
-    MAX_REVISION_ATTEMPTS = int(os.getenv("MAX_REVISION_ATTEMPTS", "3"))
-    
-    @classmethod
-    def validate(cls) -> bool:
+    MIN_QUALITY_SCORE: float
+    MAX_REVISION_ATTEMPTS: int
+
+    def validate(self) -> bool:
         """Valida se todas as configurações obrigatórias estão presentes"""
         required_vars = [
             "OPENAI_API_KEY"
         ]
-        
+
         missing_vars = []
         for var in required_vars:
-            if not getattr(cls, var):
+            if not getattr(self, var):
                 missing_vars.append(var)
-        
+
         if missing_vars:
             print(f"Variáveis de ambiente obrigatórias não encontradas: {missing_vars}")
             return False
-        
+
         return True
 
-config = Config()
+# Instância única, avaliada uma vez na importação
+config = Config(
+    OPENAI_API_KEY=os.getenv("OPENAI_API_KEY"),
+    DEBUG=os.getenv("DEBUG", "True").lower() == "true",
+    TESSERACT_PATH=os.getenv("TESSERACT_PATH", "/usr/bin/tesseract"),
+    PADDLE_OCR_ENABLED=os.getenv("PADDLE_OCR_ENABLED", "False").lower() == "true",
+    AWS_ACCESS_KEY_ID=os.getenv("AWS_ACCESS_KEY_ID"),
+    AWS_SECRET_ACCESS_KEY=os.getenv("AWS_SECRET_ACCESS_KEY"),
+    AWS_REGION=os.getenv("AWS_REGION", "us-east-1"),
+    AWS_TEXTRACT_ENABLED=os.getenv("AWS_TEXTRACT_ENABLED", "False").lower() == "true",
+    AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT=os.getenv("AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT"),
+    AZURE_DOCUMENT_INTELLIGENCE_KEY=os.getenv("AZURE_DOCUMENT_INTELLIGENCE_KEY"),
+    AZURE_ENABLED=os.getenv("AZURE_ENABLED", "False").lower() == "true",
+    GOOGLE_CLOUD_PROJECT_ID=os.getenv("GOOGLE_CLOUD_PROJECT_ID"),
+    GOOGLE_APPLICATION_CREDENTIALS=os.getenv("GOOGLE_APPLICATION_CREDENTIALS"),
+    GOOGLE_DOCUMENT_AI_ENABLED=os.getenv("GOOGLE_DOCUMENT_AI_ENABLED", "False").lower() == "true",
+    DATABASE_URL=os.getenv("DATABASE_URL", "sqlite:///./privacy_point.db"),
+    MONGODB_URL=os.getenv("MONGODB_URL", "mongodb://localhost:27017/privacy_point"),
+    CHECKPOINT_DB=os.getenv("CHECKPOINT_DB", "checkpoints.db"),
+    REDIS_URL=os.getenv("REDIS_URL", "redis://localhost:6379"),
+    API_HOST=os.getenv("API_HOST", "0.0.0.0"),
+    API_PORT=int(os.getenv("API_PORT", "8000")),
+    API_WORKERS=int(os.getenv("API_WORKERS", "1")),
+    SECRET_KEY=os.getenv("SECRET_KEY", "your-secret-key-change-in-production"),
+    ALGORITHM="HS256",
+    ACCESS_TOKEN_EXPIRE_MINUTES=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")),
+    MAX_FILE_SIZE=int(os.getenv("MAX_FILE_SIZE", "10485760")),  # 10MB
+    ALLOWED_EXTENSIONS=frozenset({".pdf", ".png", ".jpg", ".jpeg", ".tiff", ".bmp"}),
+    UPLOAD_DIR=os.getenv("UPLOAD_DIR", "storage"),
+    SENTRY_DSN=os.getenv("SENTRY_DSN"),
+    LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO"),
+    MIN_QUALITY_SCORE=float(os.getenv("MIN_QUALITY_SCORE", "0.8")),
+    MAX_REVISION_ATTEMPTS=int(os.getenv("MAX_REVISION_ATTEMPTS", "3")),
+)
@@ -0,0 +1,38 @@
+"""
+Armazenamento de arquivos enviados
+Os bytes ficam fora do estado do workflow; o estado carrega apenas a chave do arquivo
+"""
+from pathlib import Path
+from typing import Optional
+
+from src.config import config
+
+class LocalFileStorage:
+    """Armazena arquivos em disco, endereçados por chave (ex.: "uploads/<document_id>")"""
+
+    def __init__(self, base_dir: str):
+        self.base_dir = Path(base_dir)
+
+    def _path(self, key: str) -> Path:
+        return self.base_dir / key
+
+    def put(self, key: str, data: bytes) -> str:
+        """Grava o arquivo e retorna a chave"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return key
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Lê o arquivo, ou None se ele não existir"""
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key: str) -> None:
+        """Remove o arquivo, se existir"""
+        self._path(key).unlink(missing_ok=True)
+
+# Instância única, compartilhada pela API e pelos agentes
+storage = LocalFileStorage(config.UPLOAD_DIR)
@@ -2,14 +2,17 @@
 Dashboard Streamlit para o sistema Privacy Point
 """
 import streamlit as st
-import requests
-import json
-import time
+import orjson
 from datetime import datetime
-from typing import Dict, Any, List
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+if TYPE_CHECKING:
+    # Importados sob demanda nas funções; aqui apenas para as anotações de tipo
+    import numpy as np
+    import pandas as pd
+    import plotly.graph_objects as go
+    import requests
 
 # Configuração da página
 st.set_page_config(
@@ -22,6 +25,296 @@ st.set_page_config(
 # Configurações
 API_BASE_URL = "http://localhost:8000/api/v1"
 
+# Tipos de documento suportados e seus rótulos
+DOCUMENT_TYPE_LABELS = {
+    "politica_privacidade": "Política de Privacidade",
+    "termo_consentimento": "Termo de Consentimento",
+    "clausula_contratual": "Cláusula Contratual",
+    "ata_comite": "Ata de Comitê",
+    "codigo_conduta": "Código de Conduta",
+    "acordo_tratamento_dados": "Acordo de Tratamento de Dados",
+    "notificacao_violacao": "Notificação de Violação",
+    "avaliacao_impacto": "Avaliação de Impacto"
+}
+
+# Tamanho máximo padrão de upload, em MB (mesmo limite padrão da API)
+DEFAULT_MAX_FILE_SIZE_MB = 10
+
+# Etapas do workflow na ordem de execução (usadas para estimar o progresso)
+WORKFLOW_STEPS = [
+    "ocr", "classifier", "data_mapping", "research", "legal_expert", "cyber_security",
+    "structure", "generator", "quality", "compliance", "human_supervision"
+]
+
+@st.cache_resource
+def _session() -> "requests.Session":
+    """Sessão HTTP compartilhada (reaproveita conexões com a API)"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=2, backoff_factor=0.3)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def _executor() -> ThreadPoolExecutor:
+    """Executor compartilhado para chamadas longas à API"""
+    return ThreadPoolExecutor(max_workers=4)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _probe_health(api_url: str) -> bool:
+    """Verifica a saúde da API (resultado reaproveitado entre reruns)"""
+    try:
+        return _session().get(f"{api_url}/health", timeout=2).status_code == 200
+    except Exception:
+        return False
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _fetch_metrics(api_url: str) -> Dict[str, Any]:
+    """Obtém as métricas agregadas do sistema em uma única chamada"""
+    try:
+        response = _session().get(f"{api_url}/metrics", timeout=2)
+        if response.status_code == 200:
+            return orjson.loads(response.content)
+    except Exception:
+        pass
+    return {}
+
+@st.cache_data(ttl=1, show_spinner=False)
+def _fetch_document_status(api_url: str, document_id: str) -> Dict[str, Any]:
+    """Consulta o status de um documento na API"""
+    try:
+        response = _session().get(f"{api_url}/documents/{document_id}/status", timeout=2)
+        if response.status_code == 200:
+            return orjson.loads(response.content)
+    except Exception:
+        pass
+    return {}
+
+@st.cache_resource
+def _plotly():
+    """Importa o plotly sob demanda (apenas páginas com gráficos pagam o custo)"""
+    import plotly.graph_objects as go
+    return go
+
+# Dados simulados e gráficos (memoizados entre reruns do script)
+@st.cache_data
+def _recent_docs_df() -> "pd.DataFrame":
+    """Documentos recentes exibidos no dashboard"""
+    import pandas as pd
+    
+    recent_docs = [
+        {
+            "ID": "doc-001",
+            "Tipo": "Política de Privacidade",
+            "Empresa": "TechCorp Ltda",
+            "Status": "Aprovado",
+            "Qualidade": "85%",
+            "Conformidade": "90%",
+            "Data": "2024-01-15 14:30"
+        },
+        {
+            "ID": "doc-002", 
+            "Tipo": "Termo de Consentimento",
+            "Empresa": "HealthClinic",
+            "Status": "Em Revisão",
+            "Qualidade": "78%",
+            "Conformidade": "82%",
+            "Data": "2024-01-15 13:45"
+        }
+    ]
+    
+    return pd.DataFrame(recent_docs)
+
+@st.cache_data
+def _documents_df() -> "pd.DataFrame":
+    """Lista de documentos"""
+    import pandas as pd
+    
+    documents = [
+        {
+            "ID": "doc-001",
+            "Tipo": "Política de Privacidade",
+            "Empresa": "TechCorp Ltda",
+            "Status": "Aprovado",
+            "Qualidade": "85%",
+            "Conformidade": "90%",
+            "Data": "2024-01-15 14:30",
+            "Tempo": "12 min"
+        },
+        {
+            "ID": "doc-002",
+            "Tipo": "Termo de Consentimento", 
+            "Empresa": "HealthClinic",
+            "Status": "Em Revisão",
+            "Qualidade": "78%",
+            "Conformidade": "82%",
+            "Data": "2024-01-15 13:45",
+            "Tempo": "8 min"
+        },
+        {
+            "ID": "doc-003",
+            "Tipo": "Cláusula Contratual",
+            "Empresa": "FinanceBank",
+            "Status": "Processando",
+            "Qualidade": "-",
+            "Conformidade": "-", 
+            "Data": "2024-01-15 15:20",
+            "Tempo": "5 min"
+        }
+    ]
+    
+    df = pd.DataFrame(documents)
+    df["Status"] = df["Status"].astype("category")
+    df["Tipo"] = df["Tipo"].astype("category")
+    return df
+
+@st.cache_data
+def _documents_index() -> Dict[str, Any]:
+    """Documentos agrupados por status e por tipo"""
+    df = _documents_df()
+    return {
+        "all": df,
+        "by_status": dict(tuple(df.groupby("Status", observed=True))),
+        "by_type": dict(tuple(df.groupby("Tipo", observed=True)))
+    }
+
+@st.cache_data
+def _performance_df() -> "pd.DataFrame":
+    """Performance detalhada por agente"""
+    import pandas as pd
+    
+    performance_data = [
+        {
+            "Agente": "OCR Agent",
+            "Documentos Processados": 156,
+            "Taxa de Sucesso": "95%",
+            "Tempo Médio": "2.3s",
+            "Erros": 8
+        },
+        {
+            "Agente": "Classifier Agent",
+            "Documentos Processados": 156,
+            "Taxa de Sucesso": "88%",
+            "Tempo Médio": "1.8s",
+            "Erros": 19
+        },
+        {
+            "Agente": "Research Agent",
+            "Documentos Processados": 156,
+            "Taxa de Sucesso": "92%",
+            "Tempo Médio": "3.2s",
+            "Erros": 12
+        },
+        {
+            "Agente": "Structure Agent",
+            "Documentos Processados": 156,
+            "Taxa de Sucesso": "85%",
+            "Tempo Médio": "2.1s",
+            "Erros": 23
+        },
+        {
+            "Agente": "Generator Agent",
+            "Documentos Processados": 156,
+            "Taxa de Sucesso": "90%",
+            "Tempo Médio": "8.5s",
+            "Erros": 16
+        },
+        {
+            "Agente": "Quality Agent",
+            "Documentos Processados": 156,
+            "Taxa de Sucesso": "87%",
+            "Tempo Médio": "4.2s",
+            "Erros": 20
+        },
+        {
+            "Agente": "Compliance Agent",
+            "Documentos Processados": 156,
+            "Taxa de Sucesso": "93%",
+            "Tempo Médio": "3.8s",
+            "Erros": 11
+        }
+    ]
+    
+    return pd.DataFrame(performance_data)
+
+@st.cache_data
+def _volume_series() -> Tuple["np.ndarray", "np.ndarray"]:
+    """Volume diário de documentos (datas e quantidades)"""
+    import numpy as np
+    import pandas as pd
+    
+    dates = pd.date_range(start="2024-01-01", end="2024-01-15", freq="D")
+    volumes = np.array([5, 8, 12, 6, 9, 15, 11, 7, 13, 10, 8, 14, 9, 12, 11], dtype=np.int32)
+    
+    return dates.values, volumes
+
+@st.cache_resource
+def _documents_by_type_fig() -> "go.Figure":
+    """Gráfico de documentos por tipo"""
+    go = _plotly()
+    data = {
+        "Tipo": ["Política de Privacidade", "Termo de Consentimento", "Cláusula Contratual"],
+        "Quantidade": [5, 3, 2]
+    }
+    fig = go.Figure(go.Bar(
+        x=data["Tipo"],
+        y=data["Quantidade"],
+        marker=dict(color=data["Quantidade"], colorscale="Plasma", showscale=True)
+    ))
+    fig.update_layout(xaxis_title="Tipo", yaxis_title="Quantidade")
+    return fig
+
+@st.cache_resource
+def _quality_compliance_fig() -> "go.Figure":
+    """Gráfico de qualidade vs conformidade"""
+    go = _plotly()
+    data = {
+        "Documento": ["Doc 1", "Doc 2", "Doc 3", "Doc 4"],
+        "Qualidade": [0.85, 0.92, 0.78, 0.88],
+        "Conformidade": [0.90, 0.85, 0.82, 0.95]
+    }
+    fig = go.Figure(go.Scattergl(
+        x=data["Qualidade"],
+        y=data["Conformidade"],
+        text=data["Documento"],
+        mode="markers+text",
+        textposition="top center"
+    ))
+    fig.update_layout(xaxis_title="Qualidade", yaxis_title="Conformidade")
+    return fig
+
+@st.cache_resource
+def _volume_fig() -> "go.Figure":
+    """Gráfico de volume por período"""
+    go = _plotly()
+    dates, volumes = _volume_series()
+    fig = go.Figure(go.Scattergl(x=dates, y=volumes, mode="lines"))
+    fig.update_layout(xaxis_title="Data", yaxis_title="Documentos")
+    return fig
+
+@st.cache_resource
+def _agent_performance_fig() -> "go.Figure":
+    """Gráfico de performance por agente"""
+    go = _plotly()
+    agents = ["OCR", "Classificador", "Pesquisa", "Estruturação", "Geração", "Qualidade", "Conformidade"]
+    performance = [95, 88, 92, 85, 90, 87, 93]
+    
+    fig = go.Figure(go.Bar(
+        x=agents,
+        y=performance,
+        marker=dict(color=performance, colorscale="Plasma", showscale=True)
+    ))
+    fig.update_layout(xaxis_title="Agente", yaxis_title="Performance")
+    return fig
+
 def main():
     """Função principal do dashboard"""
     
@@ -51,84 +344,52 @@ def show_dashboard():
     st.title("Dashboard - Privacy Point")
     
     # Verificar saúde da API
-    try:
-        health_response = requests.get(f"{API_BASE_URL}/health", timeout=5)
-        if health_response.status_code == 200:
-            st.success("API conectada e funcionando")
-        else:
-            st.warning("API não está respondendo - Modo Demo")
-    except Exception as e:
+    if _probe_health(API_BASE_URL):
+        st.success("API conectada e funcionando")
+    else:
         st.warning("API não disponível - Modo Demo")
         st.info("Algumas funcionalidades podem estar limitadas")
     
-    # Métricas rápidas
+    _metrics_row()
+    _charts_row()
+    _recent_table()
+
+@st.fragment
+def _metrics_row():
+    """Métricas rápidas"""
+    metrics = _fetch_metrics(API_BASE_URL)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Documentos Processados", "0", "0%")
+        st.metric("Documentos Processados", f"{metrics.get('total_documents_processed', 0)}")
     
     with col2:
-        st.metric("Taxa de Sucesso", "0%", "0%")
+        st.metric("Taxa de Sucesso", f"{metrics.get('success_rate', 0.0):.0%}")
     
     with col3:
-        st.metric("Tempo Médio", "0 min", "0%")
+        st.metric("Tempo Médio", f"{metrics.get('average_processing_time', 0.0):.1f} min")
     
     with col4:
-        st.metric("Documentos Ativos", "0", "0%")
-    
-    # Gráficos
+        st.metric("Documentos Ativos", f"{metrics.get('active_workflows', 0)}")
+
+@st.fragment
+def _charts_row():
+    """Gráficos"""
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Documentos por Tipo")
-        # Dados simulados
-        data = {
-            "Tipo": ["Política de Privacidade", "Termo de Consentimento", "Cláusula Contratual"],
-            "Quantidade": [5, 3, 2]
-        }
-        df = pd.DataFrame(data)
-        fig = px.bar(df, x="Tipo", y="Quantidade", color="Quantidade")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(_documents_by_type_fig(), use_container_width=True)
     
     with col2:
         st.subheader("Qualidade vs Conformidade")
-        # Dados simulados
-        data = {
-            "Documento": ["Doc 1", "Doc 2", "Doc 3", "Doc 4"],
-            "Qualidade": [0.85, 0.92, 0.78, 0.88],
-            "Conformidade": [0.90, 0.85, 0.82, 0.95]
-        }
-        df = pd.DataFrame(data)
-        fig = px.scatter(df, x="Qualidade", y="Conformidade", text="Documento")
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Documentos recentes
+        st.plotly_chart(_quality_compliance_fig(), use_container_width=True)
+
+@st.fragment
+def _recent_table():
+    """Documentos recentes"""
     st.subheader("Documentos Recentes")
-    
-    # Dados simulados
-    recent_docs = [
-        {
-            "ID": "doc-001",
-            "Tipo": "Política de Privacidade",
-            "Empresa": "TechCorp Ltda",
-            "Status": "Aprovado",
-            "Qualidade": "85%",
-            "Conformidade": "90%",
-            "Data": "2024-01-15 14:30"
-        },
-        {
-            "ID": "doc-002", 
-            "Tipo": "Termo de Consentimento",
-            "Empresa": "HealthClinic",
-            "Status": "Em Revisão",
-            "Qualidade": "78%",
-            "Conformidade": "82%",
-            "Data": "2024-01-15 13:45"
-        }
-    ]
-    
-    df_recent = pd.DataFrame(recent_docs)
-    st.dataframe(df_recent, use_container_width=True)
+    st.table(_recent_docs_df())
 
 def show_document_generator():
     """Página para gerar novos documentos"""
@@ -143,26 +404,8 @@ def show_document_generator():
         with col1:
             document_type = st.selectbox(
                 "Tipo de Documento",
-                [
-                    "politica_privacidade",
-                    "termo_consentimento", 
-                    "clausula_contratual",
-                    "ata_comite",
-                    "codigo_conduta",
-                    "acordo_tratamento_dados",
-                    "notificacao_violacao",
-                    "avaliacao_impacto"
-                ],
-                format_func=lambda x: {
-                    "politica_privacidade": "Política de Privacidade",
-                    "termo_consentimento": "Termo de Consentimento",
-                    "clausula_contratual": "Cláusula Contratual",
-                    "ata_comite": "Ata de Comitê",
-                    "codigo_conduta": "Código de Conduta",
-                    "acordo_tratamento_dados": "Acordo de Tratamento de Dados",
-                    "notificacao_violacao": "Notificação de Violação",
-                    "avaliacao_impacto": "Avaliação de Impacto"
-                }[x]
+                list(DOCUMENT_TYPE_LABELS),
+                format_func=DOCUMENT_TYPE_LABELS.__getitem__
             )
             
             company_name = st.text_input("Nome da Empresa")
@@ -200,8 +443,9 @@ def show_document_generator():
         submitted = st.form_submit_button("🚀 Gerar Documento")
         
         if submitted:
-            if not company_name or not activity_description:
-                st.error("Por favor, preencha todos os campos obrigatórios")
+            errors = _validate_document_form(company_name, activity_description, uploaded_file)
+            if errors:
+                st.error("\n\n".join(errors))
                 return
             
             # Preparar dados
@@ -220,46 +464,140 @@ def show_document_generator():
                 "external_system_id": external_system_id if external_system_id else None
             }
             
-            # Enviar requisição
-            try:
-                files = {}
-                if uploaded_file:
-                    files = {"file": uploaded_file}
-                
-                response = requests.post(
-                    f"{API_BASE_URL}/documents/generate",
-                    data={"request": json.dumps(request_data)},
-                    files=files
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    st.success(f"Documento iniciado com sucesso!")
-                    st.info(f"ID do Documento: {result['document_id']}")
-                    st.info(f"Tempo estimado: {result['estimated_completion_time']} minutos")
-                    
-                    # Mostrar progresso
-                    show_document_progress(result['document_id'])
-                else:
-                    st.error(f"Erro ao gerar documento: {response.text}")
-                    
-            except Exception as e:
-                st.error(f"Erro de conexão: {str(e)}")
+            # Enviar requisição em segundo plano (a interface continua responsiva durante o upload)
+            st.session_state.pop("submission_result", None)
+            st.session_state.pop("submission_error", None)
+            st.session_state["pending_submission"] = _executor().submit(
+                _submit_document, _session(), request_data, uploaded_file
+            )
+    
+    # Acompanhar envio em andamento
+    if "pending_submission" in st.session_state:
+        show_submission_status()
+    
+    if "submission_error" in st.session_state:
+        st.error(st.session_state["submission_error"])
+    
+    if "submission_result" in st.session_state:
+        result = st.session_state["submission_result"]
+        st.success("Documento iniciado com sucesso!")
+        st.info(f"ID do Documento: {result['document_id']}")
+        st.info(f"Tempo estimado: {result['estimated_completion_time']} minutos")
+    
+    # Mostrar progresso
+    if "active_document_id" in st.session_state:
+        show_document_progress(st.session_state["active_document_id"])
 
-def show_document_progress(document_id: str):
-    """Mostra progresso de um documento específico"""
+def _store_max_file_size():
+    """Copia o limite do widget para uma chave própria (o Streamlit apaga a chave do widget fora da página de configurações)"""
+    st.session_state["max_file_size_mb"] = st.session_state["max_file_size_mb_input"]
+
+def _validate_document_form(company_name: str, activity_description: str,
+                            uploaded_file: Optional[Any]) -> List[str]:
+    """Valida o formulário de geração e retorna todos os erros encontrados"""
+    errors = []
+    
+    if not company_name or not activity_description:
+        errors.append("Por favor, preencha todos os campos obrigatórios")
+    
+    max_file_size_mb = st.session_state.get("max_file_size_mb", DEFAULT_MAX_FILE_SIZE_MB)
+    if uploaded_file and uploaded_file.size > max_file_size_mb * 1024 * 1024:
+        errors.append(f"Arquivo muito grande. Tamanho máximo: {max_file_size_mb} MB")
+    
+    return errors
+
+def _submit_document(session: "requests.Session", request_data: Dict[str, Any],
+                     uploaded_file: Optional[Any]) -> "requests.Response":
+    """Envia a requisição de geração para a API"""
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+    
+    # Multipart em streaming: o arquivo é lido direto do buffer do upload
+    fields = {"request": orjson.dumps(request_data).decode()}
+    if uploaded_file:
+        fields["file"] = (uploaded_file.name, uploaded_file, uploaded_file.type)
+    encoder = MultipartEncoder(fields=fields)
+    
+    return session.post(
+        f"{API_BASE_URL}/documents/generate",
+        data=encoder,
+        headers={"Content-Type": encoder.content_type}
+    )
+
+@st.fragment(run_every="1s")
+def show_submission_status():
+    """Mostra o andamento do envio e registra o resultado quando concluído"""
+    future = st.session_state["pending_submission"]
+    
+    if not future.done():
+        st.status("Enviando documento...", state="running")
+        return
+    
+    del st.session_state["pending_submission"]
+    
+    try:
+        response = future.result()
+        if response.status_code == 200:
+            result = orjson.loads(response.content)
+            st.session_state["submission_result"] = result
+            st.session_state["active_document_id"] = result["document_id"]
+        else:
+            st.session_state["submission_error"] = f"Erro ao gerar documento: {response.text}"
+    except Exception as e:
+        st.session_state["submission_error"] = f"Erro de conexão: {str(e)}"
+    
+    st.rerun()
+
+def _is_terminal(status: Dict[str, Any]) -> bool:
+    """Indica se o workflow não avança mais (concluído, interrompido por falha ou parado aguardando revisão)"""
+    # current_status == "error" não basta: agentes o usam para falhas parciais e o workflow segue adiante
+    return (
+        bool(status.get("is_complete"))
+        or bool(status.get("is_failed"))
+        or status.get("current_step") == "done"
+    )
+
+def _render_document_progress(document_id: str, status: Dict[str, Any]):
+    """Renderiza o progresso de um documento a partir de um status já obtido"""
     st.subheader(f"Progresso - {document_id}")
     
-    # Simular progresso
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+    if status.get("is_complete"):
+        progress = 100
+    elif status.get("current_step") in WORKFLOW_STEPS:
+        progress = int(100 * WORKFLOW_STEPS.index(status["current_step"]) / len(WORKFLOW_STEPS))
+    else:
+        progress = 0
+    
+    # Um único elemento por atualização (evita mensagens redundantes ao navegador)
+    if status.get("is_failed"):
+        st.status("Erro no processamento", state="error")
+    elif progress == 100:
+        st.status("Concluído!", state="complete")
+    elif status.get("current_step") == "done":
+        st.status(f"Processamento encerrado ({status.get('current_status', '-')})", state="complete")
+    elif status:
+        st.status(f"Processando ({status.get('current_step', '-')})... {progress}%", state="running")
+    else:
+        st.status("Aguardando status da API...", state="running")
+
+@st.fragment(run_every="2s")
+def _poll_document_progress(document_id: str):
+    """Atualiza o progresso a partir da API até o workflow atingir um estado final"""
+    status = _fetch_document_status(API_BASE_URL, document_id)
     
-    for i in range(100):
-        time.sleep(0.1)
-        progress_bar.progress(i + 1)
-        status_text.text(f"Processando... {i + 1}%")
+    if _is_terminal(status):
+        # Guarda o status final e recarrega a página: a partir daí o progresso é renderizado sem polling
+        st.session_state["final_document_status"] = status
+        st.rerun()
     
-    status_text.text("Concluído!")
+    _render_document_progress(document_id, status)
+
+def show_document_progress(document_id: str):
+    """Mostra progresso de um documento específico"""
+    final_status = st.session_state.get("final_document_status", {})
+    if final_status.get("document_id") == document_id:
+        _render_document_progress(document_id, final_status)
+    else:
+        _poll_document_progress(document_id)
 
 def show_documents_list():
     """Lista todos os documentos"""
@@ -283,49 +621,20 @@ def show_documents_list():
     with col3:
         date_filter = st.date_input("Data")
     
-    # Dados simulados
-    documents = [
-        {
-            "ID": "doc-001",
-            "Tipo": "Política de Privacidade",
-            "Empresa": "TechCorp Ltda",
-            "Status": "Aprovado",
-            "Qualidade": "85%",
-            "Conformidade": "90%",
-            "Data": "2024-01-15 14:30",
-            "Tempo": "12 min"
-        },
-        {
-            "ID": "doc-002",
-            "Tipo": "Termo de Consentimento", 
-            "Empresa": "HealthClinic",
-            "Status": "Em Revisão",
-            "Qualidade": "78%",
-            "Conformidade": "82%",
-            "Data": "2024-01-15 13:45",
-            "Tempo": "8 min"
-        },
-        {
-            "ID": "doc-003",
-            "Tipo": "Cláusula Contratual",
-            "Empresa": "FinanceBank",
-            "Status": "Processando",
-            "Qualidade": "-",
-            "Conformidade": "-", 
-            "Data": "2024-01-15 15:20",
-            "Tempo": "5 min"
-        }
-    ]
+    index = _documents_index()
     
-    # Filtrar dados
+    # Filtrar dados (grupos pré-calculados; apenas a combinação de filtros usa máscara)
+    df = index["all"]
     if status_filter != "Todos":
-        documents = [d for d in documents if d["Status"] == status_filter]
+        df = index["by_status"].get(status_filter, df.iloc[0:0])
     
     if type_filter != "Todos":
-        documents = [d for d in documents if d["Tipo"] == type_filter]
+        if status_filter == "Todos":
+            df = index["by_type"].get(type_filter, df.iloc[0:0])
+        else:
+            df = df[df["Tipo"] == type_filter]
     
     # Mostrar tabela
-    df = pd.DataFrame(documents)
     st.dataframe(df, use_container_width=True)
     
     # Ações em lote
@@ -369,89 +678,16 @@ def show_metrics():
     
     with col1:
         st.subheader("Volume por Período")
-        # Dados simulados
-        dates = pd.date_range(start="2024-01-01", end="2024-01-15", freq="D")
-        volumes = [5, 8, 12, 6, 9, 15, 11, 7, 13, 10, 8, 14, 9, 12, 11]
-        
-        df_volume = pd.DataFrame({
-            "Data": dates,
-            "Documentos": volumes
-        })
-        
-        fig = px.line(df_volume, x="Data", y="Documentos")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(_volume_fig(), use_container_width=True)
     
     with col2:
         st.subheader("🎯 Performance por Agente")
-        # Dados simulados
-        agents = ["OCR", "Classificador", "Pesquisa", "Estruturação", "Geração", "Qualidade", "Conformidade"]
-        performance = [95, 88, 92, 85, 90, 87, 93]
-        
-        df_perf = pd.DataFrame({
-            "Agente": agents,
-            "Performance": performance
-        })
-        
-        fig = px.bar(df_perf, x="Agente", y="Performance", color="Performance")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(_agent_performance_fig(), use_container_width=True)
     
     # Tabela de performance
     st.subheader("Performance Detalhada")
     
-    performance_data = [
-        {
-            "Agente": "OCR Agent",
-            "Documentos Processados": 156,
-            "Taxa de Sucesso": "95%",
-            "Tempo Médio": "2.3s",
-            "Erros": 8
-        },
-        {
-            "Agente": "Classifier Agent",
-            "Documentos Processados": 156,
-            "Taxa de Sucesso": "88%",
-            "Tempo Médio": "1.8s",
-            "Erros": 19
-        },
-        {
-            "Agente": "Research Agent",
-            "Documentos Processados": 156,
-            "Taxa de Sucesso": "92%",
-            "Tempo Médio": "3.2s",
-            "Erros": 12
-        },
-        {
-            "Agente": "Structure Agent",
-            "Documentos Processados": 156,
-            "Taxa de Sucesso": "85%",
-            "Tempo Médio": "2.1s",
-            "Erros": 23
-        },
-        {
-            "Agente": "Generator Agent",
-            "Documentos Processados": 156,
-            "Taxa de Sucesso": "90%",
-            "Tempo Médio": "8.5s",
-            "Erros": 16
-        },
-        {
-            "Agente": "Quality Agent",
-            "Documentos Processados": 156,
-            "Taxa de Sucesso": "87%",
-            "Tempo Médio": "4.2s",
-            "Erros": 20
-        },
-        {
-            "Agente": "Compliance Agent",
-            "Documentos Processados": 156,
-            "Taxa de Sucesso": "93%",
-            "Tempo Médio": "3.8s",
-            "Erros": 11
-        }
-    ]
-    
-    df_perf_detailed = pd.DataFrame(performance_data)
-    st.dataframe(df_perf_detailed, use_container_width=True)
+    st.table(_performance_df())
 
 def show_settings():
     """Página de configurações"""
@@ -463,14 +699,10 @@ def show_settings():
     api_url = st.text_input("URL da API", value=API_BASE_URL)
     
     if st.button("Testar Conexão"):
-        try:
-            response = requests.get(f"{api_url}/health")
-            if response.status_code == 200:
-                st.success("Conexão bem-sucedida!")
-            else:
-                st.error("Falha na conexão")
-        except Exception:
-            st.error("Erro de conexão")
+        if _probe_health(api_url):
+            st.success("Conexão bem-sucedida!")
+        else:
+            st.error("Falha na conexão")
     
     # Configurações do sistema
     st.subheader("⚙️ Configurações do Sistema")
@@ -478,7 +710,14 @@ def show_settings():
     col1, col2 = st.columns(2)
     
     with col1:
-        max_file_size = st.number_input("Tamanho máximo de arquivo (MB)", value=10, min_value=1, max_value=100)
+        max_file_size = st.number_input(
+            "Tamanho máximo de arquivo (MB)",
+            value=st.session_state.get("max_file_size_mb", DEFAULT_MAX_FILE_SIZE_MB),
+            min_value=1,
+            max_value=100,
+            key="max_file_size_mb_input",
+            on_change=_store_max_file_size
+        )
         quality_threshold = st.slider("Limite de qualidade padrão", 0.0, 1.0, 0.8, 0.05)
     
     with col2:
@@ -0,0 +1,74 @@
+"""
+Serialização dos checkpoints do workflow em MessagePack (msgspec)
+Mais rápida e compacta que o serializador JSON padrão do LangGraph
+"""
+from datetime import datetime
+from typing import Any
+
+import msgspec
+from langgraph.serde.base import SerializerProtocol
+
+from .state import DocumentType, ProcessingStatus
+
+# Canais do estado cujos valores são enums: o MessagePack guarda apenas o valor e o tipo é restaurado na leitura
+ENUM_CHANNELS = {
+    "document_type": DocumentType,
+    "status": ProcessingStatus,
+    "current_status": ProcessingStatus
+}
+
+# Código da extensão MessagePack para canais cujo valor é um conjunto (ex.: a barreira de junção dos ramos
+# paralelos): o msgspec grava sets como listas, e a barreira precisa voltar como set para ser retomada
+SET_EXT_CODE = 1
+
+# Canais com datetimes sem fuso: o MessagePack os grava como texto ISO 8601 e o tipo é restaurado na leitura
+DATETIME_CHANNELS = ("created_at", "updated_at", "approval_date")
+
+_set_encoder = msgspec.msgpack.Encoder()
+_set_decoder = msgspec.msgpack.Decoder()
+
+def _enc_hook(obj: Any) -> Any:
+    """Converte objetos sem representação nativa (ex.: modelos pydantic)"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Tipo não serializável no checkpoint: {type(obj).__name__}")
+
+def _ext_hook(code: int, data: memoryview) -> Any:
+    """Restaura os tipos gravados como extensão"""
+    if code == SET_EXT_CODE:
+        return set(_set_decoder.decode(data))
+    raise TypeError(f"Extensão MessagePack desconhecida no checkpoint: {code}")
+
+class MsgpackSerializer(SerializerProtocol):
+    """Serializador de checkpoints baseado em msgspec.msgpack"""
+
+    def __init__(self):
+        self._encoder = msgspec.msgpack.Encoder(enc_hook=_enc_hook)
+        self._decoder = msgspec.msgpack.Decoder(ext_hook=_ext_hook)
+
+    def dumps(self, obj: Any) -> bytes:
+        channel_values = obj.get("channel_values") if isinstance(obj, dict) else None
+        if isinstance(channel_values, dict) and any(isinstance(v, (set, frozenset)) for v in channel_values.values()):
+            obj = {**obj, "channel_values": {
+                channel: msgspec.msgpack.Ext(SET_EXT_CODE, _set_encoder.encode(list(value)))
+                if isinstance(value, (set, frozenset)) else value
+                for channel, value in channel_values.items()
+            }}
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes) -> Any:
+        obj = self._decoder.decode(data)
+        channel_values = obj.get("channel_values") if isinstance(obj, dict) else None
+        if isinstance(channel_values, dict):
+            for channel, enum_type in ENUM_CHANNELS.items():
+                value = channel_values.get(channel)
+                if isinstance(value, str):
+                    channel_values[channel] = enum_type(value)
+            for channel in DATETIME_CHANNELS:
+                value = channel_values.get(channel)
+                if isinstance(value, str):
+                    channel_values[channel] = datetime.fromisoformat(value)
+            context = channel_values.get("context")
+            if isinstance(context, dict) and isinstance(context.get("deadline"), str):
+                context["deadline"] = datetime.fromisoformat(context["deadline"])
+        return obj
@@ -1,8 +1,12 @@
-from typing import TypedDict, Optional, Dict, Any, List, Union
+import operator
+from typing import TypedDict, Optional, Dict, Any, List, Union, Annotated
 from datetime import datetime
-from enum import Enum
+from enum import StrEnum
 
-class DocumentType(Enum):
+# Limite de entradas mantidas em processing_log (as mais antigas são descartadas)
+MAX_PROCESSING_LOG_ENTRIES = 500
+
+class DocumentType(StrEnum):
     PRIVACY_POLICY = "politica_privacidade"
     CONSENT_FORM = "termo_consentimento"
     CONTRACT_CLAUSE = "clausula_contratual"
@@ -12,7 +16,7 @@ class DocumentType(Enum):
     BREACH_NOTIFICATION = "notificacao_violacao"
     IMPACT_ASSESSMENT = "avaliacao_impacto"
 
-class ProcessingStatus(Enum):
+class ProcessingStatus(StrEnum):
     PENDING = "pending"
     PROCESSING = "processing"
     OCR_COMPLETE = "ocr_complete"
@@ -27,6 +31,51 @@ class ProcessingStatus(Enum):
     REJECTED = "rejected"
     ERROR = "error"
 
+def keep_error_status(current: Optional[ProcessingStatus], new: ProcessingStatus) -> ProcessingStatus:
+    """Reducer de status: um erro registrado por qualquer ramo paralelo prevalece"""
+    return current if current == ProcessingStatus.ERROR else new
+
+def append_bounded_log(current: Optional[List[str]], new: List[str]) -> List[str]:
+    """Reducer de processing_log: acrescenta as novas entradas mantendo apenas as mais recentes"""
+    merged = (current or []) + new
+    return merged[-MAX_PROCESSING_LOG_ENTRIES:]
+
+def keep_first_error(current: Optional[str], new: Optional[str]) -> Optional[str]:
+    """Reducer de erro: mantém a primeira mensagem quando ramos paralelos falham juntos"""
+    return current if current else new
+
+# Campos acumulados por reducer: uma atualização traz apenas as entradas novas
+APPEND_KEYS = ("processing_log", "error_messages")
+
+def snapshot_state(state: "DocumentState") -> "DocumentState":
+    """Cópia do estado em que listas e dicionários também são copiados (agentes os alteram no lugar)"""
+    return {key: value.copy() if isinstance(value, (list, dict)) else value for key, value in state.items()}
+
+def state_delta(before: "DocumentState", after: "DocumentState") -> Dict[str, Any]:
+    """Chaves alteradas entre dois estados; para APPEND_KEYS, apenas as entradas acrescentadas"""
+    delta = {}
+    for key, value in after.items():
+        previous = before.get(key)
+        if key in APPEND_KEYS:
+            new_entries = value[len(previous or []):]
+            if new_entries:
+                delta[key] = new_entries
+        elif key not in before or value != previous:
+            delta[key] = value
+    return delta
+
+class WorkflowContext(TypedDict):
+    """Contexto compartilhado entre agentes"""
+    workflow_id: str
+    user_id: Optional[str]
+    session_id: str
+    priority: str  # low, medium, high, urgent
+    deadline: Optional[datetime]
+    custom_requirements: Dict[str, Any]
+    template_preferences: Dict[str, Any]
+    quality_threshold: float
+    compliance_level: str  # basic, standard, strict
+
 class DocumentState(TypedDict):
     # Identificação
     document_id: str
@@ -37,33 +86,55 @@ class DocumentState(TypedDict):
     updated_at: datetime
     
     # Status e controle
+    status: Annotated[ProcessingStatus, keep_error_status]
+    error: Annotated[Optional[str], keep_first_error]
+    error_type: Annotated[Optional[str], keep_first_error]
     current_status: ProcessingStatus
     current_step: str
-    processing_log: List[str]
-    error_messages: List[str]
+    last_node: str  # último nó sequencial concluído, usado no roteamento do grafo
+    # Nós retornam apenas as entradas novas; os reducers as acrescentam ao histórico
+    processing_log: Annotated[List[str], append_bounded_log]
+    error_messages: Annotated[List[str], operator.add]
+    context: WorkflowContext
     
     # Dados de entrada
     uploaded_file: Optional[bytes]
+    uploaded_file_ref: Optional[str]  # chave do arquivo em src.storage
     file_name: Optional[str]
     file_type: Optional[str]
     original_text: Optional[str]
     
     # OCR e extração
+    ocr_results: Dict[str, Any]
     ocr_text: Optional[str]
     ocr_confidence: float
     extracted_data: Dict[str, Any]
     document_classification: Optional[str]
+    classification_results: Dict[str, Any]
+    complexity: Optional[str]
+    urgency: Optional[str]
+    estimated_pages: Optional[int]
+    
+    # Mapeamento de dados
+    data_mapping_results: Dict[str, Any]
+    company_info: Dict[str, Any]
     
     # Pesquisa regulatória
     applicable_laws: List[str]
     legal_basis: List[str]
     regulatory_requirements: List[str]
     compliance_gaps: List[str]
+    research_results: Dict[str, Any]
+    
+    # Assessoria jurídica e segurança (executadas em paralelo com a pesquisa)
+    legal_expert_results: Dict[str, Any]
+    cyber_security_results: Dict[str, Any]
     
     # Estruturação
     document_structure: Optional[Dict[str, Any]]
     required_sections: List[str]
     content_outline: Optional[str]
+    structure_results: Dict[str, Any]
     
     # Geração de conteúdo
     generated_content: Optional[str]
@@ -75,23 +146,27 @@ class DocumentState(TypedDict):
     quality_issues: List[str]
     revision_attempts: int
     quality_checklist: Dict[str, bool]
+    quality_assessment: Dict[str, Any]
     
     # Conformidade
     compliance_score: float
     compliance_issues: List[str]
     compliance_checklist: Dict[str, bool]
     regulatory_validation: Dict[str, Any]
+    compliance_validation: Dict[str, Any]
     
     # Supervisão humana
     human_reviewer: Optional[str]
     human_feedback: Optional[str]
     human_approval: Optional[bool]
     approval_date: Optional[datetime]
+    human_supervision_results: Dict[str, Any]
     
     # Metadados
     processing_time: float
     agent_performance: Dict[str, float]
     final_document_path: Optional[str]
+    metadata: Dict[str, Any]
     
     # Integração
     external_system_id: Optional[str]
@@ -108,15 +183,3 @@ class DocumentState(TypedDict):
     is_complete: bool
     is_approved: bool
     can_be_delivered: bool
-
-class WorkflowContext(TypedDict):
-    """Contexto compartilhado entre agentes"""
-    workflow_id: str
-    user_id: Optional[str]
-    session_id: str
-    priority: str  # low, medium, high, urgent
-    deadline: Optional[datetime]
-    custom_requirements: Dict[str, Any]
-    template_preferences: Dict[str, Any]
-    quality_threshold: float
-    compliance_level: str  # basic, standard, strict
@@ -4,51 +4,364 @@ Orquestração dos agentes especializados usando LangGraph
 """
 
 import structlog
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 from datetime import datetime
 import uuid
+import time
+import asyncio
+import hashlib
+import aiosqlite
+from functools import lru_cache
+import orjson
+from cachetools import TTLCache
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.aiosqlite import AsyncSqliteSaver
 from langgraph.graph import StateGraph, END
+from langgraph.graph.graph import CompiledGraph
 
+from src.config import config as settings
+from src.storage import storage
+from src.agents.base_agent import TRANSIENT_ERRORS
 from src.agents import (
     OCRAgent, ClassifierAgent, ResearchAgent, StructureAgent, 
     GeneratorAgent, QualityAgent, ComplianceAgent, HumanSupervisionAgent,
     DataMappingAgent, CyberSecurityAgent, LegalExpertAgent
 )
-from .state import DocumentState, ProcessingStatus, WorkflowContext
+from .serde import MsgpackSerializer
+from .state import (
+    DocumentState, DocumentType, ProcessingStatus, WorkflowContext, APPEND_KEYS, snapshot_state, state_delta
+)
 
 logger = structlog.get_logger()
 
+# Agentes executados em paralelo após o mapeamento de dados, com as chaves de estado que cada um escreve
+PARALLEL_OUTPUTS = {
+    "research": ("applicable_laws", "legal_basis", "regulatory_requirements", "compliance_gaps"),
+    "legal_expert": ("legal_expert_results",),
+    "cyber_security": ("cyber_security_results",)
+}
+
+# Topologia do grafo: (origem, destino). Um destino tupla dispara ramos paralelos;
+# uma origem tupla aguarda todos eles no nó de junção, que verifica erros antes de seguir
+STEPS = (
+    ("ocr", "classifier"),
+    ("classifier", "data_mapping"),
+    ("data_mapping", tuple(PARALLEL_OUTPUTS)),
+    (tuple(PARALLEL_OUTPUTS), "parallel_join"),
+    ("parallel_join", "structure"),
+    ("structure", "generator"),
+    ("generator", "quality"),
+    ("quality", "compliance"),
+    ("compliance", "human_supervision"),
+    ("human_supervision", END),
+    ("auto_approval", END)
+)
+
+# Próxima etapa após cada nó sequencial
+NEXT = {
+    source: target for source, target in STEPS
+    if isinstance(source, str) and isinstance(target, str)
+}
+
+# Documentos processados simultaneamente em lote, conforme a prioridade do contexto
+BATCH_CONCURRENCY = {
+    "low": 2,
+    "medium": 4,
+    "high": 8,
+    "urgent": 8
+}
+DEFAULT_BATCH_CONCURRENCY = BATCH_CONCURRENCY["medium"]
+
+# Tentativas de um nó diante de falhas transitórias (TRANSIENT_ERRORS) antes de o workflow ser encerrado
+MAX_NODE_ATTEMPTS = 3
+
+# Nós cujo resultado depende apenas destes campos: entradas repetidas são servidas do cache
+CACHEABLE_INPUTS = {
+    "classifier": ("document_type", "company_name", "activity_description", "ocr_text"),
+    "research": ("document_type", "company_name", "activity_description", "industry_sector"),
+    "legal_expert": ("document_type", "activity_description", "industry_sector", "company_info")
+}
+NODE_CACHE_TTL = 24 * 60 * 60
+
+# Atualizações bem-sucedidas dos nós em CACHEABLE_INPUTS, por (nó, hash das entradas)
+_node_cache = TTLCache(maxsize=1024, ttl=NODE_CACHE_TTL)
+
+# Mensagem de log do início de cada nó
+NODE_MESSAGES = {
+    "ocr": "Executando OCR",
+    "classifier": "Executando classificador",
+    "data_mapping": "Executando mapeamento de dados",
+    "research": "Executando pesquisa",
+    "legal_expert": "Executando assessoria jurídica",
+    "cyber_security": "Executando avaliação de segurança",
+    "structure": "Executando estruturação",
+    "generator": "Executando geração",
+    "quality": "Executando controle de qualidade",
+    "compliance": "Executando validação de conformidade",
+    "human_supervision": "Executando supervisão humana"
+}
+
+# Classe de cada agente, instanciada apenas no primeiro uso
+AGENT_CLASSES = {
+    "ocr": OCRAgent,
+    "classifier": ClassifierAgent,
+    "data_mapping": DataMappingAgent,
+    "research": ResearchAgent,
+    "legal_expert": LegalExpertAgent,
+    "cyber_security": CyberSecurityAgent,
+    "structure": StructureAgent,
+    "generator": GeneratorAgent,
+    "quality": QualityAgent,
+    "compliance": ComplianceAgent,
+    "human_supervision": HumanSupervisionAgent
+}
+
+def _parallel_update(name: str, delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Restringe a atualização de um ramo paralelo às chaves que ele produz e às acumuladas por reducer"""
+    return {key: delta[key] for key in (*PARALLEL_OUTPUTS[name], *APPEND_KEYS) if key in delta}
+
+def _cache_key(name: str, state: DocumentState) -> tuple:
+    """Chave do cache de um nó: nome e hash das entradas que determinam seu resultado"""
+    inputs = orjson.dumps(
+        [state.get(key) for key in CACHEABLE_INPUTS[name]],
+        option=orjson.OPT_SORT_KEYS, default=str
+    )
+    return name, hashlib.blake2b(inputs, digest_size=16).digest()
+
+def _node_failed(delta: Dict[str, Any]) -> bool:
+    """Indica se o nó falhou: status de erro no estado ou em algum resultado próprio (ex.: {"status": "error"})"""
+    if ProcessingStatus.ERROR in (delta.get("status"), delta.get("current_status")) or delta.get("error_messages"):
+        return True
+    return any(isinstance(value, dict) and value.get("status") == "error" for value in delta.values())
+
+def _make_node(name: str):
+    """Cria o nó do grafo que executa o agente `name` da instância recebida na configuração"""
+    start_message = NODE_MESSAGES[name]
+    parallel = name in PARALLEL_OUTPUTS
+    
+    @retry(
+        stop=stop_after_attempt(MAX_NODE_ATTEMPTS),
+        wait=wait_exponential_jitter(initial=1, max=10),
+        retry=retry_if_exception_type(TRANSIENT_ERRORS),
+        before_sleep=lambda retry_state: retry_state.args[2].warning(
+            "Falha transitória, repetindo nó", node=name,
+            attempt=retry_state.attempt_number, error=str(retry_state.outcome.exception())
+        ),
+        reraise=True
+    )
+    async def run_agent(agent, state: DocumentState, log) -> DocumentState:
+        # Cada tentativa parte de uma cópia nova: o grafo recebe apenas o que mudou
+        return await agent.aprocess(snapshot_state(state))
+    
+    async def node(state: DocumentState, config: RunnableConfig) -> Dict[str, Any]:
+        log = config["configurable"]["logger"]
+        cache_key = _cache_key(name, state) if name in CACHEABLE_INPUTS else None
+        cached = _node_cache.get(cache_key) if cache_key else None
+        
+        if cached is not None:
+            log.info(start_message, cached=True)
+            delta = snapshot_state(cached)
+        else:
+            # Exceções propagam: o checkpoint mantém este nó pendente e aresume o executa de novo
+            log.info(start_message)
+            agent = config["configurable"]["workflow"].get_agent(name)
+            delta = state_delta(state, await run_agent(agent, state, log))
+            
+            if cache_key and not _node_failed(delta):
+                _node_cache[cache_key] = snapshot_state(delta)
+        
+        if parallel:
+            return _parallel_update(name, delta)
+        delta["last_node"] = name
+        return delta
+    
+    return node
+
+def _route_entry(state: DocumentState) -> str:
+    """Primeira etapa: OCR apenas quando há arquivo enviado"""
+    if state.get("uploaded_file_ref") is None and not state.get("uploaded_file"):
+        return "classifier"
+    
+    return "ocr"
+
+def _meets_quality_threshold(state: DocumentState) -> bool:
+    """Indica se qualidade e conformidade atingiram o limiar do contexto"""
+    threshold = (state.get("context") or {}).get("quality_threshold", settings.MIN_QUALITY_SCORE)
+    return state.get("quality_score", 0.0) >= threshold and state.get("compliance_score", 0.0) >= threshold
+
+def _route(state: DocumentState) -> str:
+    """Próxima etapa após o último nó sequencial executado"""
+    target = NEXT[state["last_node"]]
+    # Documentos acima do limiar dispensam a supervisão humana
+    if target == "human_supervision" and _meets_quality_threshold(state):
+        return "auto_approval"
+    return target
+
+async def _parallel_join(state: DocumentState) -> Dict[str, Any]:
+    """Junção dos ramos paralelos: a estrutura só começa depois que todos terminaram"""
+    return {"last_node": "parallel_join"}
+
+async def _auto_approve(state: DocumentState, config: RunnableConfig) -> Dict[str, Any]:
+    """Aprova automaticamente um documento que atingiu o limiar de qualidade e conformidade"""
+    quality_score, compliance_score = state.get("quality_score", 0.0), state.get("compliance_score", 0.0)
+    config["configurable"]["logger"].info(
+        "Aprovação automática", quality_score=quality_score, compliance_score=compliance_score
+    )
+    return {
+        "current_status": ProcessingStatus.APPROVED,
+        "current_step": "Auto Approval",
+        "is_approved": True,
+        "can_be_delivered": True,
+        "is_complete": True,
+        "processing_log": [
+            f"Workflow: aprovado automaticamente (qualidade {quality_score:.2f}, conformidade {compliance_score:.2f})"
+        ],
+        "last_node": "auto_approval"
+    }
+
+@lru_cache(maxsize=1)
+def _build_graph() -> CompiledGraph:
+    """Constrói e compila o grafo do workflow uma única vez por processo"""
+    
+    # Criar grafo
+    workflow = StateGraph(DocumentState)
+    
+    # Adicionar nós (agentes)
+    for name in NODE_MESSAGES:
+        workflow.add_node(name, _make_node(name))
+    workflow.add_node("parallel_join", _parallel_join)
+    workflow.add_node("auto_approval", _auto_approve)
+    
+    # Definir ponto de entrada: sem arquivo enviado, o OCR é pulado
+    workflow.set_conditional_entry_point(_route_entry, {"ocr": "ocr", "classifier": "classifier"})
+    
+    # Definir fluxo a partir de STEPS: etapas sequenciais, disparo dos ramos paralelos e junção
+    for source, target in STEPS:
+        if isinstance(source, tuple):
+            workflow.add_edge(list(source), target)
+        elif isinstance(target, tuple):
+            for branch in target:
+                workflow.add_edge(source, branch)
+        else:
+            path_map = {target: target}
+            if target == "human_supervision":
+                path_map["auto_approval"] = "auto_approval"
+            workflow.add_conditional_edges(source, _route, path_map)
+    
+    # Checkpoint a cada etapa: um documento que falha pode ser retomado sem refazer as etapas concluídas
+    checkpointer = AsyncSqliteSaver(
+        aiosqlite.connect(settings.CHECKPOINT_DB),
+        serde=MsgpackSerializer()
+    )
+    return workflow.compile(checkpointer=checkpointer)
+
+# Serializa a primeira conexão do checkpointer: setup() concorrente abriria a mesma conexão duas vezes
+_setup_lock: Optional[asyncio.Lock] = None
+
+async def aopen_checkpointer() -> CompiledGraph:
+    """Conecta o checkpointer e cria suas tabelas uma única vez; deve preceder qualquer uso concorrente do grafo"""
+    global _setup_lock
+    graph = _build_graph()
+    if not graph.checkpointer.is_setup:
+        if _setup_lock is None:
+            _setup_lock = asyncio.Lock()
+        async with _setup_lock:
+            if not graph.checkpointer.is_setup:
+                await graph.checkpointer.setup()
+                await _create_failures_table(graph.checkpointer.conn)
+    return graph
+
+async def _create_failures_table(conn: aiosqlite.Connection) -> None:
+    """Tabela de falhas dos workflows, no mesmo banco dos checkpoints (sobrevive a reinícios e é vista por todos os workers)"""
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS workflow_failures (
+            thread_id TEXT PRIMARY KEY,
+            error TEXT,
+            error_type TEXT,
+            failed_at TEXT
+        )
+        """
+    )
+    await conn.commit()
+
+async def _save_failure(document_id: str, failure: Dict[str, str]) -> None:
+    """Registra a falha de um workflow até que ele seja retomado"""
+    conn = (await aopen_checkpointer()).checkpointer.conn
+    await conn.execute(
+        "INSERT OR REPLACE INTO workflow_failures (thread_id, error, error_type, failed_at) VALUES (?, ?, ?, ?)",
+        (document_id, failure["error"], failure["error_type"], datetime.now().isoformat())
+    )
+    await conn.commit()
+
+async def _load_failure(document_id: str) -> Optional[Dict[str, str]]:
+    """Falha registrada para o workflow, ou None"""
+    conn = (await aopen_checkpointer()).checkpointer.conn
+    async with conn.execute(
+        "SELECT error, error_type FROM workflow_failures WHERE thread_id = ?", (document_id,)
+    ) as cursor:
+        row = await cursor.fetchone()
+    return {"error": row[0], "error_type": row[1]} if row else None
+
+async def _clear_failure(document_id: str) -> None:
+    """Remove a falha registrada (o workflow foi retomado)"""
+    conn = (await aopen_checkpointer()).checkpointer.conn
+    await conn.execute("DELETE FROM workflow_failures WHERE thread_id = ?", (document_id,))
+    await conn.commit()
+
+async def aclose_checkpointer() -> None:
+    """Fecha a conexão do checkpointer; o grafo é recompilado (e reconectado) no próximo uso"""
+    global _setup_lock
+    if _build_graph.cache_info().currsize:
+        await _build_graph().checkpointer.conn.close()
+        _build_graph.cache_clear()
+    _setup_lock = None
+
 class DocumentWorkflow:
     """Workflow principal para geração de documentos LGPD/ANPD"""
     
     def __init__(self):
-        self.agents = {
-            "ocr": OCRAgent(),
-            "classifier": ClassifierAgent(),
-            "data_mapping": DataMappingAgent(),
-            "research": ResearchAgent(),
-            "legal_expert": LegalExpertAgent(),
-            "cyber_security": CyberSecurityAgent(),
-            "structure": StructureAgent(),
-            "generator": GeneratorAgent(),
-            "quality": QualityAgent(),
-            "compliance": ComplianceAgent(),
-            "human_supervision": HumanSupervisionAgent()
-        }
+        # Agentes instanciados sob demanda: um documento que falha cedo não carrega os demais
+        self._agents: Dict[str, Any] = {}
+    
+    @property
+    def graph(self) -> CompiledGraph:
+        """Grafo compilado compartilhado pelo processo"""
+        return _build_graph()
+    
+    def _run_sync(self, coroutine):
+        """Executa uma corrotina em um event loop próprio, fechando o checkpointer ao final"""
+        async def main():
+            try:
+                await aopen_checkpointer()
+                return await coroutine
+            finally:
+                await aclose_checkpointer()
         
-        self.graph = self._build_graph()
+        return asyncio.run(main())
+    
+    def get_agent(self, name: str):
+        """Retorna o agente solicitado, criando-o no primeiro acesso"""
+        agent = self._agents.get(name)
+        if agent is None:
+            agent = self._agents.setdefault(name, AGENT_CLASSES[name]())
+        return agent
     
     def create_initial_state(self, document_type: str, company_name: str, 
                            activity_description: str, uploaded_file: Optional[bytes] = None,
-                           context: Optional[WorkflowContext] = None) -> DocumentState:
+                           context: Optional[WorkflowContext] = None,
+                           industry_sector: str = "geral", language: str = "pt-BR",
+                           jurisdiction: str = "BR", webhook_url: Optional[str] = None,
+                           external_system_id: Optional[str] = None) -> DocumentState:
         """Cria o estado inicial para o workflow"""
         
         # Criar contexto padrão se não fornecido
         if context is None:
             context = WorkflowContext(
-                workflow_id=str(uuid.uuid4()),
+                workflow_id=uuid.uuid4().hex,
                 user_id=None,
-                session_id=str(uuid.uuid4()),
+                session_id=uuid.uuid4().hex,
                 priority="medium",
                 deadline=None,
                 custom_requirements={},
@@ -57,32 +370,43 @@ class DocumentWorkflow:
                 compliance_level="standard"
             )
         
+        document_id = str(uuid.uuid4())
+        now = datetime.now()
+        
+        # O arquivo fica no armazenamento; o estado (e cada checkpoint) carrega só a chave
+        uploaded_file_ref = None
+        if uploaded_file is not None:
+            uploaded_file_ref = storage.put(f"uploads/{document_id}", uploaded_file)
+        
         # Criar estado inicial
         initial_state = DocumentState(
-            document_id=str(uuid.uuid4()),
-            document_type=document_type,
+            document_id=document_id,
+            document_type=DocumentType(document_type),
             company_name=company_name,
             activity_description=activity_description,
-            industry_sector="geral",
-            language="pt-BR",
-            jurisdiction="BR",
+            industry_sector=industry_sector,
+            language=language,
+            jurisdiction=jurisdiction,
             status=ProcessingStatus.PENDING,
-            created_at=datetime.now(),
-            updated_at=datetime.now(),
+            current_status=ProcessingStatus.PENDING,
+            created_at=now,
+            updated_at=now,
             context=context,
-            uploaded_file=uploaded_file,
+            uploaded_file=None,
+            uploaded_file_ref=uploaded_file_ref,
             ocr_results={},
             classification_results={},
-            data_mapping={},
+            data_mapping_results={},
             research_results={},
-            legal_expert={},
-            cyber_security={},
+            legal_expert_results={},
+            cyber_security_results={},
             structure_results={},
             generated_content="",
             quality_assessment={},
             compliance_validation={},
-            human_supervision={},
+            human_supervision_results={},
             processing_log=[],
+            error_messages=[],
             error=None,
             is_complete=False,
             is_approved=False,
@@ -90,308 +414,167 @@ class DocumentWorkflow:
             compliance_score=0.0,
             processing_time=0.0,
             metadata={},
-            webhook_url=None,
-            external_system_id=None
+            webhook_url=webhook_url,
+            external_system_id=external_system_id
         )
         
         return initial_state
     
     def get_workflow_status(self, document_id: str) -> Dict[str, Any]:
-        """Obtém o status de um workflow específico"""
-        # Implementação simplificada - em produção, buscar do banco de dados
+        """Obtém o status de um workflow específico (versão síncrona de aget_workflow_status)"""
+        return self._run_sync(self.aget_workflow_status(document_id))
+    
+    async def aget_workflow_status(self, document_id: str) -> Dict[str, Any]:
+        """Obtém o status de um workflow específico a partir do último checkpoint"""
+        await aopen_checkpointer()
+        snapshot = await self.graph.aget_state({"configurable": {"thread_id": document_id}})
+        return await self.astatus_from_snapshot(document_id, snapshot)
+    
+    async def astatus_from_snapshot(self, document_id: str, snapshot) -> Dict[str, Any]:
+        """Monta o status de um workflow a partir de um snapshot já obtido (ex.: do cache da API)"""
+        values = snapshot.values if snapshot else None
+        if not values:
+            return {"document_id": document_id, "status": "not_found"}
+        
+        # Só um workflow parado antes do fim pode ter falhado
+        failure = await _load_failure(document_id) if snapshot.next else None
+        error = failure["error"] if failure else values.get("error")
+        error_messages = list(values.get("error_messages") or [])
+        if error and error not in error_messages:
+            error_messages.append(error)
+        
         return {
             "document_id": document_id,
-            "current_status": "processing",
-            "current_step": "ocr",
-            "is_complete": False,
-            "is_approved": False,
-            "processing_time": 0.0,
-            "quality_score": 0.0,
-            "compliance_score": 0.0,
-            "error_messages": [],
-            "created_at": datetime.now(),
-            "updated_at": datetime.now()
+            "current_status": ProcessingStatus.ERROR if failure else values.get("current_status") or values.get("status"),
+            "current_step": snapshot.next[0] if snapshot.next else "done",
+            "is_failed": failure is not None,
+            "is_complete": values.get("is_complete", False),
+            "is_approved": values.get("is_approved", False),
+            "processing_time": values.get("processing_time", 0.0),
+            "quality_score": values.get("quality_score", 0.0),
+            "compliance_score": values.get("compliance_score", 0.0),
+            "error_messages": error_messages,
+            "created_at": values.get("created_at"),
+            "updated_at": values.get("updated_at")
         }
     
-    def _build_graph(self) -> StateGraph:
-        """Constrói o grafo do workflow"""
-        
-        # Criar grafo
-        workflow = StateGraph(DocumentState)
-        
-        # Adicionar nós (agentes)
-        workflow.add_node("ocr", self._run_ocr)
-        workflow.add_node("classifier", self._run_classifier)
-        workflow.add_node("data_mapping", self._run_data_mapping)
-        workflow.add_node("research", self._run_research)
-        workflow.add_node("legal_expert", self._run_legal_expert)
-        workflow.add_node("cyber_security", self._run_cyber_security)
-        workflow.add_node("structure", self._run_structure)
-        workflow.add_node("generator", self._run_generator)
-        workflow.add_node("quality", self._run_quality)
-        workflow.add_node("compliance", self._run_compliance)
-        workflow.add_node("human_supervision", self._run_human_supervision)
-        
-        # Definir ponto de entrada
-        workflow.set_entry_point("ocr")
-        
-        # Definir fluxo condicional
-        workflow.add_conditional_edges(
-            "ocr",
-            self._should_continue,
-            {
-                "classifier": "classifier",
-                "error": END
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "classifier",
-            self._should_continue,
-            {
-                "data_mapping": "data_mapping",
-                "error": END
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "data_mapping",
-            self._should_continue,
-            {
-                "research": "research",
-                "error": END
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "research",
-            self._should_continue,
-            {
-                "legal_expert": "legal_expert",
-                "error": END
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "legal_expert",
-            self._should_continue,
-            {
-                "cyber_security": "cyber_security",
-                "error": END
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "cyber_security",
-            self._should_continue,
-            {
-                "structure": "structure",
-                "error": END
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "structure",
-            self._should_continue,
-            {
-                "generator": "generator",
-                "error": END
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "generator",
-            self._should_continue,
-            {
-                "quality": "quality",
-                "error": END
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "quality",
-            self._should_continue,
-            {
-                "compliance": "compliance",
-                "error": END
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "compliance",
-            self._should_continue,
-            {
-                "human_supervision": "human_supervision",
-                "error": END
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "human_supervision",
-            self._should_continue,
-            {
-                "end": END,
-                "error": END
+    def _config(self, document_id: str) -> RunnableConfig:
+        """Configuração de execução: liga o grafo compartilhado a esta instância e à thread do documento"""
+        return {
+            "configurable": {
+                "workflow": self,
+                "thread_id": document_id,
+                "logger": logger.bind(document_id=document_id)
             }
-        )
-        
-        return workflow.compile()
-    
-    def _run_ocr(self, state: DocumentState) -> DocumentState:
-        """Executa o agente OCR"""
-        try:
-            logger.info("Executando OCR", document_id=state.get("document_id"))
-            return self.agents["ocr"].process(state)
-        except Exception as e:
-            logger.error("Erro no OCR", error=str(e), document_id=state.get("document_id"))
-            state["status"] = ProcessingStatus.ERROR
-            state["error"] = str(e)
-            return state
-    
-    def _run_classifier(self, state: DocumentState) -> DocumentState:
-        """Executa o agente classificador"""
-        try:
-            logger.info("Executando classificador", document_id=state.get("document_id"))
-            return self.agents["classifier"].process(state)
-        except Exception as e:
-            logger.error("Erro no classificador", error=str(e), document_id=state.get("document_id"))
-            state["status"] = ProcessingStatus.ERROR
-            state["error"] = str(e)
-            return state
-    
-    def _run_data_mapping(self, state: DocumentState) -> DocumentState:
-        """Executa o agente de mapeamento de dados"""
-        try:
-            logger.info("Executando mapeamento de dados", document_id=state.get("document_id"))
-            return self.agents["data_mapping"].process(state)
-        except Exception as e:
-            logger.error("Erro no mapeamento de dados", error=str(e), document_id=state.get("document_id"))
-            state["status"] = ProcessingStatus.ERROR
-            state["error"] = str(e)
-            return state
+        }
     
-    def _run_research(self, state: DocumentState) -> DocumentState:
-        """Executa o agente de pesquisa"""
-        try:
-            logger.info("Executando pesquisa", document_id=state.get("document_id"))
-            return self.agents["research"].process(state)
-        except Exception as e:
-            logger.error("Erro na pesquisa", error=str(e), document_id=state.get("document_id"))
-            state["status"] = ProcessingStatus.ERROR
-            state["error"] = str(e)
-            return state
+    def run(self, initial_state: DocumentState) -> DocumentState:
+        """Executa o workflow completo (versão síncrona de arun)"""
+        return self._run_sync(self.arun(initial_state))
     
-    def _run_legal_expert(self, state: DocumentState) -> DocumentState:
-        """Executa o agente jurídico especializado"""
+    async def arun(self, initial_state: DocumentState) -> DocumentState:
+        """Executa o workflow completo sem bloquear o event loop"""
+        config = self._config(initial_state["document_id"])
+        log = config["configurable"]["logger"]
         try:
-            logger.info("Executando assessoria jurídica", document_id=state.get("document_id"))
-            return self.agents["legal_expert"].process(state)
+            await aopen_checkpointer()
+            start_time = time.monotonic()
+            log.info("Iniciando workflow")
+            
+            # Executar workflow, acompanhando cada etapa concluída
+            async for update in self.astream(initial_state, config):
+                log.debug("Etapa concluída", nodes=list(update))
+            
+            snapshot = await self.graph.aget_state(config)
+            final_state = snapshot.values
+            
+            # Calcular tempo de execução
+            execution_time = time.monotonic() - start_time
+            
+            log.info("Workflow concluído", 
+                     status=final_state.get("current_status"),
+                     execution_time=execution_time)
+            
+            return final_state
+            
         except Exception as e:
-            logger.error("Erro na assessoria jurídica", error=str(e), document_id=state.get("document_id"))
-            state["status"] = ProcessingStatus.ERROR
-            state["error"] = str(e)
-            return state
+            return await self._record_failure(config, initial_state, e)
     
-    def _run_cyber_security(self, state: DocumentState) -> DocumentState:
-        """Executa o agente de segurança cibernética"""
+    async def _record_failure(self, config: RunnableConfig, state: DocumentState,
+                              error: Exception) -> DocumentState:
+        """Registra a falha de um workflow e retorna o último estado salvo marcado com o erro"""
         try:
-            logger.info("Executando avaliação de segurança", document_id=state.get("document_id"))
-            return self.agents["cyber_security"].process(state)
+            snapshot = await self.graph.aget_state(config)
         except Exception as e:
-            logger.error("Erro na avaliação de segurança", error=str(e), document_id=state.get("document_id"))
-            state["status"] = ProcessingStatus.ERROR
-            state["error"] = str(e)
-            return state
-    
-    def _run_structure(self, state: DocumentState) -> DocumentState:
-        """Executa o agente de estruturação"""
+            # A falha é registrada mesmo sem acesso ao checkpoint
+            config["configurable"]["logger"].warning("Checkpoint indisponível", error=str(e))
+            snapshot = None
+        config["configurable"]["logger"].error(
+            "Erro no workflow", error=str(error), error_type=type(error).__name__,
+            pending=list(snapshot.next) if snapshot else []
+        )
+        failure = {"error": str(error), "error_type": type(error).__name__}
         try:
-            logger.info("Executando estruturação", document_id=state.get("document_id"))
-            return self.agents["structure"].process(state)
+            await _save_failure(config["configurable"]["thread_id"], failure)
         except Exception as e:
-            logger.error("Erro na estruturação", error=str(e), document_id=state.get("document_id"))
-            state["status"] = ProcessingStatus.ERROR
-            state["error"] = str(e)
-            return state
+            config["configurable"]["logger"].warning("Falha não registrada", error=str(e))
+        
+        values = snapshot.values if snapshot and snapshot.values else state
+        return {**values, "status": ProcessingStatus.ERROR, **failure}
     
-    def _run_generator(self, state: DocumentState) -> DocumentState:
-        """Executa o agente gerador"""
-        try:
-            logger.info("Executando geração", document_id=state.get("document_id"))
-            return self.agents["generator"].process(state)
-        except Exception as e:
-            logger.error("Erro na geração", error=str(e), document_id=state.get("document_id"))
-            state["status"] = ProcessingStatus.ERROR
-            state["error"] = str(e)
-            return state
+    async def astream(self, initial_state: DocumentState,
+                      config: Optional[RunnableConfig] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Executa o workflow emitindo a atualização de cada nó assim que ele termina"""
+        async for update in self.graph.astream(
+            initial_state,
+            config=config or self._config(initial_state["document_id"]),
+            stream_mode="updates"
+        ):
+            yield update
     
-    def _run_quality(self, state: DocumentState) -> DocumentState:
-        """Executa o agente de qualidade"""
-        try:
-            logger.info("Executando controle de qualidade", document_id=state.get("document_id"))
-            return self.agents["quality"].process(state)
-        except Exception as e:
-            logger.error("Erro no controle de qualidade", error=str(e), document_id=state.get("document_id"))
-            state["status"] = ProcessingStatus.ERROR
-            state["error"] = str(e)
-            return state
+    def resume(self, document_id: str) -> Optional[DocumentState]:
+        """Retoma um workflow a partir do último checkpoint (versão síncrona de aresume)"""
+        return self._run_sync(self.aresume(document_id))
     
-    def _run_compliance(self, state: DocumentState) -> DocumentState:
-        """Executa o agente de conformidade"""
+    async def aresume(self, document_id: str) -> Optional[DocumentState]:
+        """Retoma um workflow a partir do último checkpoint, sem refazer as etapas concluídas"""
+        config = self._config(document_id)
+        config["configurable"]["logger"].info("Retomando workflow")
         try:
-            logger.info("Executando validação de conformidade", document_id=state.get("document_id"))
-            return self.agents["compliance"].process(state)
+            await _clear_failure(document_id)
+            return await self.graph.ainvoke(None, config=config)
         except Exception as e:
-            logger.error("Erro na validação de conformidade", error=str(e), document_id=state.get("document_id"))
-            state["status"] = ProcessingStatus.ERROR
-            state["error"] = str(e)
-            return state
+            return await self._record_failure(config, {"document_id": document_id}, e)
     
-    def _run_human_supervision(self, state: DocumentState) -> DocumentState:
-        """Executa o agente de supervisão humana"""
-        try:
-            logger.info("Executando supervisão humana", document_id=state.get("document_id"))
-            return self.agents["human_supervision"].process(state)
-        except Exception as e:
-            logger.error("Erro na supervisão humana", error=str(e), document_id=state.get("document_id"))
-            state["status"] = ProcessingStatus.ERROR
-            state["error"] = str(e)
-            return state
+    def batch(self, initial_states: List[DocumentState],
+              max_concurrency: Optional[int] = None) -> List[DocumentState]:
+        """Executa o workflow para vários documentos (versão síncrona de abatch)"""
+        return self._run_sync(self.abatch(initial_states, max_concurrency))
     
-    def _should_continue(self, state: DocumentState) -> str:
-        """Determina se deve continuar ou parar"""
-        if state.get("status") == ProcessingStatus.ERROR:
-            return "error"
+    async def abatch(self, initial_states: List[DocumentState],
+                     max_concurrency: Optional[int] = None) -> List[DocumentState]:
+        """Executa o workflow para vários documentos concorrentemente"""
+        if max_concurrency is None:
+            max_concurrency = max(
+                (BATCH_CONCURRENCY.get(state.get("context", {}).get("priority"), DEFAULT_BATCH_CONCURRENCY)
+                 for state in initial_states),
+                default=DEFAULT_BATCH_CONCURRENCY
+            )
         
-        # Verificar se chegou ao final
-        if "human_supervision" in state:
-            return "end"
+        logger.info("Iniciando lote", documents=len(initial_states), max_concurrency=max_concurrency)
+        # Conectar antes de disparar os documentos: todos compartilham a mesma conexão
+        await aopen_checkpointer()
         
-        return "continue"
-    
-    def run(self, initial_state: DocumentState) -> DocumentState:
-        """Executa o workflow completo"""
-        try:
-            start_time = datetime.now()
-            logger.info("Iniciando workflow", document_id=initial_state.get("document_id"))
-            
-            # Executar workflow
-            final_state = self.graph.invoke(initial_state)
-            
-            # Calcular tempo de execução
-            end_time = datetime.now()
-            execution_time = (end_time - start_time).total_seconds()
-            
-            logger.info("Workflow concluído", 
-                       document_id=initial_state.get("document_id"),
-                       status=final_state.get("status"),
-                       execution_time=execution_time)
-            
-            return final_state
-            
-        except Exception as e:
-            logger.error("Erro no workflow", 
-                        error=str(e), document_id=initial_state.get("document_id"))
-            initial_state["status"] = ProcessingStatus.ERROR
-            initial_state["error"] = str(e)
-            return initial_state
+        configs = [
+            {**self._config(state["document_id"]), "max_concurrency": max_concurrency}
+            for state in initial_states
+        ]
+        results = await self.graph.abatch(initial_states, config=configs, return_exceptions=True)
+        
+        final_states = []
+        for config, initial_state, result in zip(configs, initial_states, results):
+            if isinstance(result, Exception):
+                result = await self._record_failure(config, initial_state, result)
+            final_states.append(result)
+        
+        return final_states